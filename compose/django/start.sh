@@ -1,7 +1,5 @@
 #!/bin/sh
 
-nohup compose/django/scheduler.sh &
-
 python3 manage.py migrate
 python3 manage.py runserver 0.0.0.0:8000
 
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 import os
 
+from celery.schedules import crontab
 from corsheaders.defaults import default_headers
 
 
@@ -58,6 +59,7 @@ POST_DJANGO_APPS = [
     "corsheaders",
     "rest_framework",
     "rest_framework.authtoken",
+    "django_filters",
 ]
 
 # Locally installed apps.
@@ -208,3 +210,114 @@ CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "Europe/Amsterdam"
+# Periodic tasks are scheduled by the beat embedded in the worker (celery worker -B).
+CELERYBEAT_SCHEDULE = {
+    "run-maintenance": {
+        "task": "src.application.tasks.run_maintenance",
+        "schedule": crontab(hour=int(os.getenv("MAINTENANCE_HOUR", 4)), minute=0),
+    },
+    "reconcile-storage": {
+        "task": "src.download.tasks.reconcile_storage",
+        "schedule": crontab(hour=int(os.getenv("MAINTENANCE_HOUR", 4)), minute=30),
+    },
+}
+
+
+# Progress reporting
+# Progress updates are emitted at most every interval (in milliseconds) or step (in percent).
+PROGRESS_INTERVAL = int(os.getenv("PROGRESS_INTERVAL", 1000))
+PROGRESS_STEP = int(os.getenv("PROGRESS_STEP", 5))
+# The storage size of downloading requests is updated along with their progress at most every interval (in seconds).
+PROGRESS_STORAGE_INTERVAL = int(os.getenv("PROGRESS_STORAGE_INTERVAL", 10))
+
+
+# HTTP sessions
+# Every worker process keeps a pool of keep-alive connections for up to HTTP_POOL_CONNECTIONS hosts
+# with up to HTTP_POOL_MAXSIZE connections per host.
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 10))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 16))
+
+
+# Resource handler
+# The maximum amount of resources downloaded concurrently per resource request.
+RESOURCE_MAX_WORKERS = int(os.getenv("RESOURCE_MAX_WORKERS", 8))
+# A page has settled once no DOM mutations or network requests occurred for the idle time (in milliseconds).
+# Loading and scrolling the page each wait at most the settle timeout (in seconds).
+RESOURCE_SETTLE_IDLE = int(os.getenv("RESOURCE_SETTLE_IDLE", 500))
+RESOURCE_SETTLE_TIMEOUT = int(os.getenv("RESOURCE_SETTLE_TIMEOUT", 10))
+RESOURCE_SCROLL_MAX_STEPS = int(os.getenv("RESOURCE_SCROLL_MAX_STEPS", 50))
+# Warm Selenium Server browser sessions are pooled per worker process and recycled after the maximum uses.
+RESOURCE_BROWSER_URL = os.getenv("RESOURCE_BROWSER_URL", "http://selenium:4444/wd/hub")
+RESOURCE_BROWSER_POOL_SIZE = int(os.getenv("RESOURCE_BROWSER_POOL_SIZE", 1))
+RESOURCE_BROWSER_MAX_USES = int(os.getenv("RESOURCE_BROWSER_MAX_USES", 20))
+# Static html with less visible characters than the minimum is rendered in a browser when using the auto render mode.
+RESOURCE_STATIC_MIN_TEXT = int(os.getenv("RESOURCE_STATIC_MIN_TEXT", 200))
+
+
+# Request list
+# The request list is paginated by cursor when a cursor or page size is given, using the default page size
+# and limited to the maximum page size.
+REQUEST_PAGE_SIZE = int(os.getenv("REQUEST_PAGE_SIZE", 50))
+REQUEST_MAX_PAGE_SIZE = int(os.getenv("REQUEST_MAX_PAGE_SIZE", 500))
+
+
+# Request logs
+# Request logs below the minimum level (e.g. DEBUG, INFO) aren't persisted. Persisted logs are written
+# in the background, in batches once the batch size is reached or the flush interval (in seconds) passed.
+REQUEST_LOG_LEVEL = os.getenv("REQUEST_LOG_LEVEL", "DEBUG")
+REQUEST_LOG_BATCH_SIZE = int(os.getenv("REQUEST_LOG_BATCH_SIZE", 200))
+REQUEST_LOG_FLUSH_INTERVAL = float(os.getenv("REQUEST_LOG_FLUSH_INTERVAL", 1))
+# At most the queue size of logs are buffered per process, further logs are dropped until the buffer is written.
+REQUEST_LOG_QUEUE_SIZE = int(os.getenv("REQUEST_LOG_QUEUE_SIZE", 10000))
+
+
+# Maintenance
+# Logs are kept for the retention (in days, including the current day, 0 keeps them forever).
+# Outdated partitions are dropped, remaining rows are deleted in batches with a pause (in seconds) in between.
+USER_LOG_RETENTION_DAYS = int(os.getenv("USER_LOG_RETENTION_DAYS", 1))
+REQUEST_LOG_RETENTION_DAYS = int(os.getenv("REQUEST_LOG_RETENTION_DAYS", 0))
+FILES_LOG_RETENTION_DAYS = int(os.getenv("FILES_LOG_RETENTION_DAYS", 0))
+MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", 5000))
+MAINTENANCE_BATCH_PAUSE = float(os.getenv("MAINTENANCE_BATCH_PAUSE", 0.1))
+
+
+# Handler probes
+# Handler probes run concurrently, each with its own network timeout (in seconds).
+# Statuses are returned once all probes finished or the deadline (in seconds) passed.
+HANDLER_PROBE_WORKERS = int(os.getenv("HANDLER_PROBE_WORKERS", 16))
+HANDLER_PROBE_TIMEOUT = int(os.getenv("HANDLER_PROBE_TIMEOUT", 10))
+HANDLER_PROBE_DEADLINE = int(os.getenv("HANDLER_PROBE_DEADLINE", 15))
+# Probe data (e.g. headers and metadata) is kept for the given seconds for reuse when the request is created.
+HANDLER_PROBE_DATA_TTL = int(os.getenv("HANDLER_PROBE_DATA_TTL", 300))
+
+
+# Audio visual handler
+# Fragments of HLS/DASH streams are downloaded concurrently and plain HTTP downloads in chunks (in bytes, 0 disables),
+# unless overridden per request. An external downloader (e.g. aria2c) with arguments can be used for all downloads.
+AUDIO_VISUAL_CONCURRENT_FRAGMENTS = int(os.getenv("AUDIO_VISUAL_CONCURRENT_FRAGMENTS", 4))
+AUDIO_VISUAL_HTTP_CHUNK_SIZE = int(os.getenv("AUDIO_VISUAL_HTTP_CHUNK_SIZE", 10 * 1024 * 1024))
+AUDIO_VISUAL_EXTERNAL_DOWNLOADER = os.getenv("AUDIO_VISUAL_EXTERNAL_DOWNLOADER", "")
+AUDIO_VISUAL_EXTERNAL_DOWNLOADER_ARGS = os.getenv("AUDIO_VISUAL_EXTERNAL_DOWNLOADER_ARGS", "")
+# The maximum amount of entries of a single playlist which are downloaded concurrently.
+AUDIO_VISUAL_PLAYLIST_CONCURRENCY = int(os.getenv("AUDIO_VISUAL_PLAYLIST_CONCURRENCY", 2))
+
+
+# qBittorrent
+# The client of each process is reconnected with an exponential backoff (in seconds, starting at the backoff)
+# and health checked at most once per health interval (in seconds).
+QBITTORRENT_URL = os.getenv("QBITTORRENT_URL", "http://qbittorrent:8001/")
+QBITTORRENT_USERNAME = os.getenv("QBITTORRENT_USERNAME", "admin")
+QBITTORRENT_PASSWORD = os.getenv("QBITTORRENT_PASSWORD", "adminadmin")
+QBITTORRENT_TIMEOUT = int(os.getenv("QBITTORRENT_TIMEOUT", 10))
+QBITTORRENT_RETRIES = int(os.getenv("QBITTORRENT_RETRIES", 6))
+QBITTORRENT_BACKOFF = float(os.getenv("QBITTORRENT_BACKOFF", 0.5))
+QBITTORRENT_BACKOFF_MAX = float(os.getenv("QBITTORRENT_BACKOFF_MAX", 30))
+QBITTORRENT_HEALTH_INTERVAL = int(os.getenv("QBITTORRENT_HEALTH_INTERVAL", 30))
+# File lists fetched while probing magnet links are cached per info hash for the TTL (in seconds).
+TORRENT_FILES_TTL = int(os.getenv("TORRENT_FILES_TTL", 24 * 60 * 60))
+
+
+# Torrent supervisor
+# Seconds between synchronizations with qBittorrent and before failing requests of torrents unknown to qBittorrent.
+TORRENT_SUPERVISOR_INTERVAL = float(os.getenv("TORRENT_SUPERVISOR_INTERVAL", 2))
+TORRENT_MISSING_TIMEOUT = int(os.getenv("TORRENT_MISSING_TIMEOUT", 300))
@@ -0,0 +1,171 @@
+"""
+Application maintenance.
+
+This file contains the maintenance engine which enforces the retention of the log tables,
+by dropping outdated partitions and deleting the remaining outdated rows in small batches,
+after moving the rows from before the tables were partitioned into their partitions.
+"""
+import time
+import datetime
+import logging
+
+from typing import Type
+from django.conf import settings
+from django.db import connection, models
+from django.utils import timezone
+
+from src.db.partitions import PARTITIONED_TABLES, ensure_partitions, drop_partitions, move_legacy_rows
+from src.download.models import RequestLog, FilesLog
+from src.user.models import Log
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionPolicy(object):
+    """
+    A retention policy which keeps the rows of a table for a number of days, including the current day.
+    A retention of 0 days keeps the rows forever.
+    """
+
+    model = None
+    days = None
+
+    def __init__(self, model: Type[models.Model], days: int) -> None:
+        """
+        Initialize the retention policy.
+
+        :param model: a Type[models.Model] of the model to clean, which must have a created_at field.
+        :param days: an int of the days to keep the rows for.
+        """
+        self.model = model
+        self.days = days
+
+        super().__init__()
+
+    @property
+    def table(self) -> str:
+        """
+        :return: a str containing the database table of the model.
+        """
+        return self.model._meta.db_table
+
+    def get_cutoff(self) -> datetime.datetime:
+        """
+        Get the local midnight before which rows are outdated.
+
+        :return: an aware datetime.
+        """
+        midnight = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight - datetime.timedelta(days=self.days - 1)
+
+
+class MaintenanceEngine(object):
+    """
+    An engine which applies retention policies. Every batch is deleted in its own (short) transaction,
+    so locks are only held for a single batch and concurrent writes are never blocked for long.
+    """
+
+    policies = None
+    batch_size = None
+    batch_pause = None
+
+    def __init__(self, policies: list, batch_size: int, batch_pause: float) -> None:
+        """
+        Initialize the maintenance engine.
+
+        :param policies: a list of RetentionPolicy objects to apply.
+        :param batch_size: an int of the maximum amount of rows deleted at once.
+        :param batch_pause: a float of the seconds to pause in between batches.
+        """
+        self.policies = policies
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+
+        super().__init__()
+
+    def run(self) -> list:
+        """
+        Create the upcoming partitions, move the legacy rows of partitioned tables which are retained
+        and apply all retention policies.
+
+        :return: a list containing a report dict (table, partitions, rows and seconds) per policy.
+        """
+        for table in PARTITIONED_TABLES:
+            created = ensure_partitions(table)
+            if created:
+                logger.info(f"Created partitions {', '.join(created)}.")
+
+        for policy in self.policies:
+            if policy.table in PARTITIONED_TABLES:
+                move_legacy_rows(
+                    policy.table, policy.get_cutoff() if policy.days else None, self.batch_size, self.batch_pause
+                )
+
+        reports = []
+        for policy in self.policies:
+            if not policy.days:
+                continue
+
+            report = self.apply(policy)
+            logger.info(
+                f"Cleaned {report['rows']} rows and {report['partitions']} partitions "
+                f"from {report['table']} in {report['seconds']:.2f} seconds."
+            )
+            reports.append(report)
+
+        return reports
+
+    def apply(self, policy: RetentionPolicy) -> dict:
+        """
+        Apply a retention policy, by dropping the outdated partitions of partitioned tables
+        and deleting the remaining outdated rows in batches.
+
+        :param policy: a RetentionPolicy object.
+        :return: a dict containing the table, dropped partitions, deleted rows and seconds taken.
+        """
+        start = time.monotonic()
+        cutoff = policy.get_cutoff()
+
+        partitions = []
+        if policy.table in PARTITIONED_TABLES:
+            partitions = drop_partitions(policy.table, cutoff)
+
+        rows = 0
+        queryset = policy.model.objects.filter(created_at__lt=cutoff)
+        while True:
+            ids = list(queryset.values_list("id", flat=True)[:self.batch_size])
+            if not ids:
+                break
+
+            # Log tables have no relations pointing to them, so each batch is deleted in a single query
+            # (a queryset delete would fetch every row, as the download signals listen to all deletes).
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM "{policy.table}" WHERE "id" = ANY(%s)', [ids])
+                rows += cursor.rowcount
+            if len(ids) < self.batch_size:
+                break
+            time.sleep(self.batch_pause)
+
+        return {
+            "table": policy.table,
+            "partitions": len(partitions),
+            "rows": rows,
+            "seconds": round(time.monotonic() - start, 2),
+        }
+
+
+def get_maintenance_engine() -> MaintenanceEngine:
+    """
+    Get a maintenance engine with the configured retention policies.
+
+    :return: a MaintenanceEngine object.
+    """
+    return MaintenanceEngine(
+        [
+            RetentionPolicy(Log, settings.USER_LOG_RETENTION_DAYS),
+            RetentionPolicy(RequestLog, settings.REQUEST_LOG_RETENTION_DAYS),
+            RetentionPolicy(FilesLog, settings.FILES_LOG_RETENTION_DAYS),
+        ],
+        settings.MAINTENANCE_BATCH_SIZE,
+        settings.MAINTENANCE_BATCH_PAUSE,
+    )
@@ -4,9 +4,8 @@ application command.
 This file contains the cleanup command.
 """
 from django.core.management.base import BaseCommand
-from django.utils import timezone
 
-from src.user.models import User, Log
+from src.application.maintenance import get_maintenance_engine
 
 
 class Command(BaseCommand):
@@ -14,7 +13,7 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         """
-        Start the cleanup command.
+        Start the cleanup command, which runs the (otherwise periodic) maintenance immediately.
 
         :param args: *
         :param options: *
@@ -22,30 +21,10 @@ class Command(BaseCommand):
         """
         self.stdout.write("Starting cleanup...")
 
-        users = User.objects.all()
-        for user in users:
-            self.stdout.write(f"Processing user {user.id} ({user.username})...")
-            self.__clean_logs(user)
-            self.stdout.write(f"Finished with user.")
+        for report in get_maintenance_engine().run():
+            self.stdout.write(
+                f"Cleaned {report['rows']} rows and {report['partitions']} partitions "
+                f"from {report['table']} in {report['seconds']:.2f} seconds."
+            )
 
         self.stdout.write(self.style.SUCCESS("Finished cleanup."))
-
-    def __clean_logs(self, user: User) -> None:
-        """
-        Cleanup outdated logs for the given user.
-
-        :param user: The user to cleanup for.
-        :return: None
-        """
-        self.stdout.write("Cleaning outdated logs...")
-
-        dt = timezone.localtime()
-        end = dt.replace(hour=0, minute=0, second=0, microsecond=0)
-        count = 0
-
-        logs = Log.objects.filter(user=user, created_at__lte=end)
-        for log in logs:
-            count += 1
-            log.delete()
-
-        self.stdout.write(f"Finished cleaning {count} outdated log(s).")
@@ -0,0 +1,38 @@
+"""
+Application tasks.
+
+This file contains the periodic Celery tasks which maintain the application.
+"""
+from celery.signals import worker_ready
+from django.core.cache import cache
+
+from config.celery import app
+from src.db.partitions import PARTITIONED_TABLES, get_legacy_table
+from .maintenance import get_maintenance_engine
+
+LEGACY_MAINTENANCE_KEY = "application.maintenance.legacy"
+
+
+@app.task
+def run_maintenance() -> list:
+    """
+    Create the upcoming log partitions and clean the outdated logs.
+
+    :return: a list containing a report dict (table, partitions, rows and seconds) per cleaned table.
+    """
+    return get_maintenance_engine().run()
+
+
+@worker_ready.connect
+def handle_worker_ready(sender, **kwargs) -> None:
+    """
+    Plan the maintenance right away once a worker has started while the rows from before the log tables
+    were partitioned haven't been moved yet, instead of waiting for the periodic maintenance.
+    The maintenance is planned once, as multiple workers may start at the same time.
+
+    :param sender: the Consumer object of the started worker.
+    :param kwargs: *
+    :return: None
+    """
+    if any(get_legacy_table(table) for table in PARTITIONED_TABLES) and cache.add(LEGACY_MAINTENANCE_KEY, True, 3600):
+        run_maintenance.delay()
@@ -0,0 +1,253 @@
+"""
+Db partitions.
+
+This file contains the helpers which maintain the time based (range) partitions of partitioned tables.
+Partitions are named after their table and start, e.g. request_log_202401 or user_log_20240131,
+and are created ahead of time so rows never end up in the default partition.
+The rows of a table from before it was partitioned are kept in a legacy table (e.g. request_log_old),
+from which they're moved into the partitioned table in batches by the maintenance.
+"""
+import time
+import uuid
+import datetime
+import logging
+
+from django.db import connection, transaction, DatabaseError
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_DAY = "day"
+INTERVAL_MONTH = "month"
+
+# The partitioned tables, their interval and the amount of partitions created ahead of time.
+PARTITIONED_TABLES = {
+    "request_log": (INTERVAL_MONTH, 2),
+    "user_log": (INTERVAL_DAY, 7),
+}
+
+
+def get_period_start(dt: datetime.datetime, interval: str) -> datetime.datetime:
+    """
+    Get the start of the partition period containing a datetime.
+
+    :param dt: an aware datetime.
+    :param interval: a str containing the partition interval.
+    :return: an aware datetime containing the start of the period.
+    """
+    dt = timezone.localtime(dt).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == INTERVAL_MONTH:
+        dt = dt.replace(day=1)
+
+    return timezone.localtime(dt)
+
+
+def get_next_period_start(start: datetime.datetime, interval: str) -> datetime.datetime:
+    """
+    Get the start of the partition period following a period.
+
+    :param start: an aware datetime containing the start of a period.
+    :param interval: a str containing the partition interval.
+    :return: an aware datetime containing the start of the next period.
+    """
+    if interval == INTERVAL_MONTH:
+        return get_period_start(start.replace(day=28) + datetime.timedelta(days=4), interval)
+
+    return get_period_start(start + datetime.timedelta(days=1, hours=12), interval)
+
+
+def get_partition_name(table: str, start: datetime.datetime, interval: str) -> str:
+    """
+    Get the name of the partition of a period.
+
+    :param table: a str containing the partitioned table name.
+    :param start: an aware datetime containing the start of the period.
+    :param interval: a str containing the partition interval.
+    :return: a str containing the partition name.
+    """
+    return f"{table}_{start:%Y%m}" if interval == INTERVAL_MONTH else f"{table}_{start:%Y%m%d}"
+
+
+def get_partitions(table: str) -> list:
+    """
+    Get the names of all partitions of a partitioned table, excluding the default partition.
+
+    :param table: a str containing the partitioned table name.
+    :return: a list containing the partition names.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = %s AND child.relname <> %s",
+            [table, f"{table}_default"],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def ensure_partitions(table: str, start: datetime.datetime = None) -> list:
+    """
+    Create the missing partitions of a partitioned table, from the period containing the start
+    up to and including the partitions ahead of the current period. A partition which fails to be created
+    is logged and skipped, so the remaining partitions (and maintenance) still proceed.
+
+    :param table: a str containing the partitioned table name.
+    :param start: an optional aware datetime to create partitions from, defaults to now.
+    :return: a list containing the names of the created partitions.
+    """
+    interval, ahead = PARTITIONED_TABLES[table]
+    now = timezone.now()
+    period = get_period_start(min(start or now, now), interval)
+    end = get_period_start(now, interval)
+    for _ in range(ahead):
+        end = get_next_period_start(end, interval)
+
+    existing = set(get_partitions(table))
+    created = []
+
+    while period <= end:
+        name = get_partition_name(table, period, interval)
+        next_period = get_next_period_start(period, interval)
+        if name not in existing:
+            try:
+                create_partition(table, name, period, next_period)
+                created.append(name)
+            except DatabaseError as e:
+                logger.error(f"Failed to create partition {name} ({str(e)}).")
+        period = next_period
+
+    return created
+
+
+def create_partition(table: str, name: str, start: datetime.datetime, end: datetime.datetime) -> None:
+    """
+    Create the partition of a period. Rows of the period which ended up in the default partition
+    (e.g. as maintenance didn't run for a while) would violate the bounds of the new partition,
+    so these are moved into the new table before it's attached as a partition.
+
+    :param table: a str containing the partitioned table name.
+    :param name: a str containing the partition name.
+    :param start: an aware datetime containing the start of the period.
+    :param end: an aware datetime containing the start of the next period.
+    :return: None
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM "{table}_default" WHERE "created_at" >= %s AND "created_at" < %s)',
+            [start, end],
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+                [start, end],
+            )
+            return
+
+        cursor.execute(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{table}_default" WHERE "created_at" >= %s AND "created_at" < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+        moved = cursor.rowcount
+        cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)', [start, end])
+        logger.warning(f"Moved {moved} rows from the default partition into partition {name}.")
+
+
+def drop_partitions(table: str, before: datetime.datetime) -> list:
+    """
+    Drop the partitions of a partitioned table which only contain rows created before a datetime.
+    Dropping a partition is the (cheap) equivalent of deleting all of its rows. Rows of the period
+    containing the datetime are kept until their whole partition can be dropped.
+
+    :param table: a str containing the partitioned table name.
+    :param before: an aware datetime.
+    :return: a list containing the names of the dropped partitions.
+    """
+    interval, _ = PARTITIONED_TABLES[table]
+    date_format = "%Y%m" if interval == INTERVAL_MONTH else "%Y%m%d"
+    dropped = []
+
+    with connection.cursor() as cursor:
+        for name in sorted(get_partitions(table)):
+            start = datetime.datetime.strptime(name[len(table) + 1:], date_format)
+            start = get_period_start(timezone.make_aware(start), interval)
+            if get_next_period_start(start, interval) <= before:
+                cursor.execute(f'DROP TABLE IF EXISTS "{name}"')
+                dropped.append(name)
+
+        # Rows only end up in the default partition when no partition existed for them.
+        cursor.execute(f'DELETE FROM "{table}_default" WHERE "created_at" < %s', [before])
+
+    return dropped
+
+
+def get_legacy_table(table: str) -> str:
+    """
+    Get the name of the legacy (unpartitioned) table of a partitioned table, when it still exists.
+
+    :param table: a str containing the partitioned table name.
+    :return: a str containing the legacy table name or None when it doesn't exist (anymore).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [f"{table}_old"])
+        return f"{table}_old" if cursor.fetchone()[0] else None
+
+
+def move_legacy_rows(table: str, after: datetime.datetime, batch_size: int, batch_pause: float) -> int:
+    """
+    Move the rows of the legacy table into the partitioned table in batches, each in its own (short) transaction,
+    and drop the legacy table once it's empty. Rows created before the given datetime are outdated
+    and dropped with the legacy table instead of being moved. An interrupted move continues on the next call.
+
+    :param table: a str containing the partitioned table name.
+    :param after: an optional aware datetime before which rows aren't moved.
+    :param batch_size: an int of the maximum amount of rows moved at once.
+    :param batch_pause: a float of the seconds to pause in between batches.
+    :return: an int containing the amount of moved rows.
+    """
+    legacy = get_legacy_table(table)
+    if legacy is None:
+        return 0
+
+    after = after or datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN("created_at") FROM "{legacy}" WHERE "created_at" >= %s', [after])
+        start = cursor.fetchone()[0]
+        if start is not None:
+            ensure_partitions(table, start)
+
+        # The columns are listed, as columns may have been added to the partitioned table since.
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = %s ORDER BY ordinal_position",
+            [legacy],
+        )
+        columns = ", ".join(f'"{row[0]}"' for row in cursor.fetchall())
+
+    rows = 0
+    last = uuid.UUID(int=0)
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'SELECT "id" FROM "{legacy}" WHERE "id" > %s ORDER BY "id" LIMIT %s', [last, batch_size])
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+
+            cursor.execute(
+                f'WITH moved AS (DELETE FROM "{legacy}" WHERE "id" = ANY(%s) AND "created_at" >= %s '
+                f'RETURNING {columns}) INSERT INTO "{table}" ({columns}) SELECT {columns} FROM moved',
+                [ids, after],
+            )
+            rows += cursor.rowcount
+
+        last = ids[-1]
+        if len(ids) < batch_size:
+            break
+        time.sleep(batch_pause)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS "{legacy}"')
+    logger.info(f"Moved {rows} rows from {legacy} into {table} and dropped {legacy}.")
+
+    return rows
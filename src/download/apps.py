@@ -17,3 +17,7 @@ class DownloadAppConfig(AppConfig):
 
     def ready(self):
         from . import signals
+        from .loggers import get_level
+
+        # Fail on startup rather than on every log when the request log level is misconfigured.
+        get_level()
@@ -0,0 +1,62 @@
+"""
+Download filters.
+
+This file contains the filter set of the request list.
+"""
+import django_filters
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import QuerySet
+
+from .models import BaseRequest
+
+
+def get_request_types() -> dict:
+    """
+    Get the request models by their request type, as serialized in the request_type field.
+
+    :return: a dict containing the request models by request type.
+    """
+    from .serializers import PolymorphicRequestSerializer
+
+    return {model.__name__: model for model in PolymorphicRequestSerializer.model_serializer_mapping}
+
+
+class RequestFilterSet(django_filters.FilterSet):
+    """
+    A filter set for the requests by status, request type and creation date range
+    (created_at_after and created_at_before), e.g. ?status=failed&request_type=TorrentRequest.
+    """
+    status = django_filters.MultipleChoiceFilter(choices=BaseRequest.STATUSES, distinct=False)
+    request_type = django_filters.MultipleChoiceFilter(
+        choices=lambda: [(request_type, request_type) for request_type in get_request_types()],
+        method="filter_request_type",
+    )
+    created_at = django_filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        """
+        Filter set metadata.
+        See https://django-filter.readthedocs.io/en/stable/ref/filterset.html
+        """
+
+        model = BaseRequest
+        fields = ("status", "request_type", "created_at")
+
+    def filter_request_type(self, queryset: QuerySet, name: str, value: list) -> QuerySet:
+        """
+        Filter the requests by their polymorphic content type, without joining the child tables.
+
+        :param queryset: a QuerySet containing BaseRequests.
+        :param name: a str containing the filter name.
+        :param value: a list containing the request types.
+        :return: a QuerySet containing the BaseRequests of the request types.
+        """
+        if not value:
+            return queryset
+
+        request_types = get_request_types()
+        content_types = ContentType.objects.get_for_models(
+            *[request_types[request_type] for request_type in value], for_concrete_models=False
+        )
+        return queryset.filter(polymorphic_ctype__in=content_types.values())
@@ -10,6 +10,7 @@ from sentry_sdk import capture_exception
 
 from .models import BaseRequest
 from .loggers import BaseLogger
+from .progress import ProgressReporter
 from .tasks import delete_request_files
 
 
@@ -19,21 +20,30 @@ class BaseHandlerStatus(object):
     when retrieving support status from all registered handlers.
     """
 
+    STATE_SUPPORTED = "supported"
+    STATE_UNSUPPORTED = "unsupported"
+    STATE_UNKNOWN = "unknown"
+
     request = None
     supported = False
     options = {}
+    unknown = False
+    failed = False
+    data = None
 
-    def __init__(self, request: str, supported=False, options=dict) -> None:
+    def __init__(self, request: str, supported=False, options=dict, unknown=False) -> None:
         """
         Initialize the handler status object.
 
         :param request: A BaseRequest object to notify the BaseRequest the status belongs to.
         :param supported: An optional bool for the handler supported status.
         :param options: An optional dict containing custom options the handler may support/require.
+        :param unknown: An optional bool whether the supported status couldn't be determined (in time).
         """
         self.request = request
         self.supported = supported
         self.options = options
+        self.unknown = unknown
 
         super().__init__()
 
@@ -55,16 +65,42 @@ class BaseHandlerStatus(object):
         """
         self.options = options
 
+    def set_failed(self, failed: bool) -> None:
+        """
+        Set failed status, when the probe failed (e.g. a network error or timeout) rather than determined
+        the url to be unsupported. Statuses of failed probes are never cached.
+
+        :param failed: A bool whether the probe failed.
+        :return: None
+        """
+        self.failed = failed
+
+    def set_data(self, data: dict) -> None:
+        """
+        Set probe data. Probe data isn't part of the status, but is briefly stored for reuse
+        by the handler when a request for the same url is created.
+
+        :param data: A dict containing data retrieved while probing.
+        :return: None
+        """
+        self.data = data
+
     def get_status(self) -> dict:
         """
         get the handler status.
 
         :return: A dict containing an enforced handler status.
         """
+        if self.unknown:
+            state = self.STATE_UNKNOWN
+        else:
+            state = self.STATE_SUPPORTED if self.supported else self.STATE_UNSUPPORTED
+
         return {
             "request": self.request,
             "supported": self.supported,
             "options": self.options,
+            "state": state,
         }
 
 
@@ -79,6 +115,14 @@ class BaseHandler(object):
 
     request = None
     logger = None
+    reporter = None
+
+    # Seconds to cache supported and unsupported handler statuses of a url (0 disables caching).
+    status_ttl = 300
+    unsupported_status_ttl = 60
+
+    # Whether the download is handed off to an external process, which finishes the request once it completed.
+    deferred = False
 
     @staticmethod
     @abstractmethod
@@ -103,6 +147,7 @@ class BaseHandler(object):
             self.request,
             f"logger.{self.request.get_handler_object().__name__}.{self.request.id}",
         )
+        self.reporter = ProgressReporter(self.request)
 
         super().__init__()
 
@@ -115,21 +160,73 @@ class BaseHandler(object):
         try:
             self._pre_process()
             self._download()
+        except Exception as e:
+            self.fail(e)
+            return
+
+        if self.is_deferred(self.request):
+            self.logger.info("Handed off the download, awaiting completion.")
+            self.logger.flush()
+        else:
+            self.finish()
+
+    @classmethod
+    def is_deferred(cls, request: BaseRequest) -> bool:
+        """
+        Notify whether the download of a request is handed off to an external process.
+        Defaults to the deferred attribute, but can be overwritten to defer depending on the request.
+
+        :param request: A BaseRequest object.
+        :return: a bool whether the download is deferred.
+        """
+        return cls.deferred
+
+    def finish(self) -> None:
+        """
+        Traverse through the remaining _action methods once the download completed and possibly trigger a full reset.
+        Deferred handlers are finished by the external process which completed the download.
+
+        :return: None
+        """
+        try:
             self._post_process()
             self._complete()
         except Exception as e:
-            self.logger.error(str(e))
-            capture_exception(e)
-            self._reset()
+            self.fail(e)
+
+    def fail(self, e: Exception) -> None:
+        """
+        Log and capture an exception and trigger a full reset.
+
+        :param e: The Exception which caused the request to fail.
+        :return: None
+        """
+        self.logger.error(str(e))
+        self.logger.flush()
+        capture_exception(e)
+        self._reset()
+
+    def get_probe_data(self) -> dict:
+        """
+        Get the (fresh) probe data which was stored when the user of the request
+        retrieved the handler status for its url.
+
+        :return: A dict containing the probe data or None when there's no fresh probe data.
+        """
+        from src.handlers.cache import get_cached_probe_data
+
+        return get_cached_probe_data(self.request.__class__.__name__, self.request.user_id, self.request.url)
 
     def _pre_process(self) -> None:
         """
-        Pre process the request by setting the request status to PRE_PROCESSING.
+        Pre process the request by setting the request status to PRE_PROCESSING, unless it already has been
+        when the request was claimed by a worker.
         Do not overwrite or extend this method. Instead implement the pre_process() method to add additional steps.
 
         :return: None
         """
-        self.request.get_state().pre_processing()
+        if self.request.status != BaseRequest.STATUS_PRE_PROCESSING:
+            self.request.get_state().pre_processing()
         self.pre_process()
 
     def pre_process(self) -> None:
@@ -147,8 +244,10 @@ class BaseHandler(object):
 
         :return: None
         """
+        self.logger.flush()
         self.request.get_state().downloading()
         self.download()
+        self.reporter.flush()
 
     def download(self) -> None:
         """
@@ -165,6 +264,7 @@ class BaseHandler(object):
 
         :return: None
         """
+        self.logger.flush()
         self.request.get_state().post_processing()
         self.post_process()
 
@@ -178,12 +278,14 @@ class BaseHandler(object):
 
     def _complete(self) -> None:
         """
-        Complete the request by setting the request status to COMPLETED.
+        Complete the request by storing its storage size and setting the request status to COMPLETED.
         Do not overwrite or extend this method. Instead implement the complete() method to add additional steps.
 
         :return: None
         """
         self.complete()
+        self.request.update_storage_size()
+        self.logger.flush()
         self.request.get_state().completed()
 
     def complete(self) -> None:
@@ -196,7 +298,8 @@ class BaseHandler(object):
 
     def _reset(self) -> None:
         """
-        Reset the handler, sets the request status to FAILED and clears all previously generated files.
+        Reset the handler, sets the request status to FAILED and clears all previously generated files
+        (and their storage size) unless the handler is able to resume them.
         Do not overwrite or extend this method. Instead implement the reset() method to add additional steps.
 
         :return: None
@@ -208,7 +311,12 @@ class BaseHandler(object):
 
         self.reset()
 
-        delete_request_files.delay(self.request.path)
+        if self.resumable():
+            self.logger.info("Kept partially downloaded files in order to resume on retry.")
+            self.request.update_storage_size()
+        else:
+            self.request.set_storage_size(0)
+            delete_request_files.delay(self.request.path)
 
     def reset(self) -> None:
         """
@@ -217,3 +325,12 @@ class BaseHandler(object):
         :return: None
         """
         pass
+
+    def resumable(self) -> bool:
+        """
+        (Optionally) notify whether the previously generated files can be resumed on retry
+        and must therefore be kept on reset.
+
+        :return: a bool whether the files must be kept.
+        """
+        return False
@@ -1,12 +1,181 @@
 """
 Download loggers.
 
-This file contains a custom Logger object for use by BaseHandler objects.
+This file contains a custom Logger object for use by BaseHandler objects
+and the buffered writer which persists their logs in batches.
 """
+import os
+import time
+import queue
+import atexit
 import logging
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections
+from django.utils import timezone
 
 from .models import BaseRequest, RequestLog
 
+logger = logging.getLogger(__name__)
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_level() -> int:
+    """
+    Get the minimum level of persisted request logs.
+
+    :return: an int containing the minimum level.
+    """
+    level = logging.getLevelName(str(settings.REQUEST_LOG_LEVEL).upper())
+    if not isinstance(level, int):
+        raise ImproperlyConfigured(f"REQUEST_LOG_LEVEL '{settings.REQUEST_LOG_LEVEL}' isn't a valid log level.")
+
+    return level
+
+
+class RequestLogWriter(object):
+    """
+    A buffered writer which persists request logs from a background thread, in batches created
+    once the batch size is reached or the flush interval passed, so logging never waits for the database.
+    The buffer is bounded, logs are dropped (and counted) rather than growing the buffer when the database falls behind.
+    """
+
+    level = None
+    batch_size = None
+    interval = None
+
+    def __init__(self, level: int, batch_size: int, interval: float, queue_size: int) -> None:
+        """
+        Initialize the writer and start its background thread.
+
+        :param level: an int of the minimum level of written logs.
+        :param batch_size: an int of the maximum amount of logs written at once.
+        :param interval: a float of the maximum seconds a log is buffered.
+        :param queue_size: an int of the maximum amount of buffered logs.
+        """
+        self.level = level
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue = queue.Queue(queue_size)
+        self.dropped = 0
+        self.thread = threading.Thread(target=self.run, name="request-log-writer", daemon=True)
+        self.thread.start()
+
+        super().__init__()
+
+    def write(self, log: RequestLog) -> None:
+        """
+        Buffer a log for writing, or drop it when the buffer is full.
+
+        :param log: an unsaved RequestLog object.
+        :return: None
+        """
+        try:
+            self.queue.put_nowait(log)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 10) -> None:
+        """
+        Wait until all previously buffered logs have been written.
+
+        :param timeout: a float containing the maximum seconds to wait.
+        :return: None
+        """
+        flushed = threading.Event()
+        try:
+            self.queue.put(flushed, timeout=timeout)
+        except queue.Full:
+            return
+        flushed.wait(timeout)
+
+    def run(self) -> None:
+        """
+        Collect buffered logs and write them in batches until the process exits.
+
+        :return: None
+        """
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = self.interval if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, RequestLog):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.interval
+                if len(batch) < self.batch_size and time.monotonic() < deadline:
+                    continue
+
+            if batch:
+                self.save(batch)
+                batch = []
+                deadline = None
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                logger.error(f"Dropped {dropped} request logs as the buffer was full.")
+            if isinstance(item, threading.Event):
+                item.set()
+
+    @staticmethod
+    def save(batch: list) -> None:
+        """
+        Write a batch of logs. When the batch fails (e.g. as a request has been deleted meanwhile),
+        the logs are written one by one, so only the failing logs are dropped.
+
+        :param batch: a list containing unsaved RequestLog objects.
+        :return: None
+        """
+        close_old_connections()
+        try:
+            RequestLog.objects.bulk_create(batch)
+            return
+        except Exception as e:
+            logger.warning(f"Failed to write {len(batch)} request logs at once ({str(e)}). Writing one by one...")
+
+        failed = 0
+        for log in batch:
+            try:
+                log.save(force_insert=True)
+            except Exception:
+                failed += 1
+        if failed:
+            logger.error(f"Failed to write {failed} of {len(batch)} request logs.")
+
+
+def get_writer() -> RequestLogWriter:
+    """
+    Get the request log writer of the current process. A new writer is started
+    after the process has been forked, as threads don't survive a fork.
+
+    :return: a RequestLogWriter object.
+    """
+    global _writer, _writer_pid
+
+    if _writer is None or _writer_pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer_pid != os.getpid():
+                _writer = RequestLogWriter(
+                    get_level(),
+                    settings.REQUEST_LOG_BATCH_SIZE,
+                    settings.REQUEST_LOG_FLUSH_INTERVAL,
+                    settings.REQUEST_LOG_QUEUE_SIZE,
+                )
+                _writer_pid = os.getpid()
+                atexit.register(_writer.flush)
+
+    return _writer
+
 
 class BaseLogger(logging.Logger):
     """
@@ -41,7 +210,8 @@ class BaseLogger(logging.Logger):
         sinfo=None,
     ):
         """
-        Intercept the Logger's LogRecord creation call and create a Download Log entity.
+        Intercept the Logger's LogRecord creation call and buffer a Download Log entity
+        when it meets the minimum persisted level.
 
         :param name: *
         :param level: int
@@ -55,8 +225,18 @@ class BaseLogger(logging.Logger):
         :param sinfo: *
         :return: *
         """
-        if msg:
-            RequestLog.objects.create(request=self.request, level=level, message=msg.strip())
+        writer = get_writer()
+        if msg and level >= writer.level:
+            # The log is stamped when it's emitted, rather than when the buffered log is written.
+            writer.write(RequestLog(request=self.request, level=level, message=msg.strip(), created_at=timezone.now()))
         return super().makeRecord(
             name, level, fn, lno, msg, args, exc_info, func, extra, sinfo
         )
+
+    def flush(self) -> None:
+        """
+        Wait until all buffered Download Log entities have been written.
+
+        :return: None
+        """
+        get_writer().flush()
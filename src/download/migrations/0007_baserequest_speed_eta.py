@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('download', '0006_alter_baserequest_polymorphic_ctype'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='baserequest',
+            name='eta',
+            field=models.IntegerField(null=True, verbose_name='eta'),
+        ),
+        migrations.AddField(
+            model_name='baserequest',
+            name='speed',
+            field=models.BigIntegerField(null=True, verbose_name='speed'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Partitions the request_log table by month on created_at.
+# The existing rows are kept in request_log_old, from which they're moved in batches by the maintenance.
+# The partitions are created the way the maintenance creates them, but are inlined so this migration never changes.
+
+import datetime
+import zoneinfo
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_partitions(apps, schema_editor):
+    tz = zoneinfo.ZoneInfo(settings.TIME_ZONE)
+    start = datetime.datetime.now(tz).date().replace(day=1)
+
+    with schema_editor.connection.cursor() as cursor:
+        # The partitions of the current month and the two months ahead.
+        for _ in range(3):
+            end = (start.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+            cursor.execute(
+                f'CREATE TABLE "request_log_{start:%Y%m}" PARTITION OF "request_log" FOR VALUES FROM (%s) TO (%s)',
+                [datetime.datetime.combine(start, datetime.time(), tz), datetime.datetime.combine(end, datetime.time(), tz)],
+            )
+            start = end
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('download', '0007_baserequest_speed_eta'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql=[
+                        'ALTER TABLE "request_log" RENAME TO "request_log_old"',
+                        'ALTER TABLE "request_log_old" RENAME CONSTRAINT "request_log_pkey" TO "request_log_old_pkey"',
+                        'CREATE TABLE "request_log" (LIKE "request_log_old" INCLUDING DEFAULTS) '
+                        'PARTITION BY RANGE ("created_at")',
+                        'ALTER TABLE "request_log" ADD CONSTRAINT "request_log_pkey" PRIMARY KEY ("id", "created_at")',
+                        'ALTER TABLE "request_log" ADD CONSTRAINT "request_log_request_id_fk_base_request_id" '
+                        'FOREIGN KEY ("request_id") REFERENCES "base_request" ("id") DEFERRABLE INITIALLY DEFERRED',
+                        'CREATE INDEX "request_log_req_created_idx" ON "request_log" ("request_id", "created_at")',
+                        'CREATE TABLE "request_log_default" PARTITION OF "request_log" DEFAULT',
+                    ],
+                    reverse_sql=[
+                        'DROP TABLE "request_log"',
+                        'ALTER TABLE "request_log_old" RENAME CONSTRAINT "request_log_old_pkey" TO "request_log_pkey"',
+                        'ALTER TABLE "request_log_old" RENAME TO "request_log"',
+                    ],
+                ),
+                migrations.RunPython(create_partitions, migrations.RunPython.noop),
+                migrations.RunSQL(
+                    sql=migrations.RunSQL.noop,
+                    # The legacy table may have been dropped already, once its rows have been moved.
+                    reverse_sql=[
+                        'DO $$ BEGIN IF to_regclass(\'request_log_old\') IS NULL THEN '
+                        'CREATE TABLE "request_log_old" (LIKE "request_log" INCLUDING DEFAULTS); '
+                        'ALTER TABLE "request_log_old" ADD CONSTRAINT "request_log_old_pkey" PRIMARY KEY ("id"); '
+                        'ALTER TABLE "request_log_old" ADD CONSTRAINT "request_log_old_request_id_fk_base_request_id" '
+                        'FOREIGN KEY ("request_id") REFERENCES "base_request" ("id") DEFERRABLE INITIALLY DEFERRED; '
+                        'CREATE INDEX "request_log_old_request_id_idx" ON "request_log_old" ("request_id"); '
+                        'END IF; END $$',
+                        'INSERT INTO "request_log_old" SELECT * FROM "request_log"',
+                    ],
+                ),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='requestlog',
+                    index=models.Index(fields=['request', 'created_at'], name='request_log_req_created_idx'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-18 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('download', '0008_partition_request_log'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fileslog',
+            index=models.Index(fields=['created_at'], name='files_log_created_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-18 17:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('download', '0009_files_log_created_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='baserequest',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='base_request_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='baserequest',
+            index=models.Index(fields=['user', 'status', 'created_at'], name='base_request_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='baserequest',
+            index=models.Index(fields=['user', 'polymorphic_ctype', 'created_at'], name='base_request_user_type_idx'),
+        ),
+    ]
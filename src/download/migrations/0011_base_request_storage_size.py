@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('download', '0010_base_request_list_indexes'),
+        ('user', '0006_user_storage_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='baserequest',
+            name='storage_size',
+            field=models.BigIntegerField(default=0, verbose_name='storage size'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-18 18:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('download', '0012_request_log_created_at_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='baserequest',
+            name='worker',
+            field=models.CharField(blank=True, max_length=255, verbose_name='worker'),
+        ),
+        migrations.AddIndex(
+            model_name='baserequest',
+            index=models.Index(fields=['worker', 'status'], name='base_request_worker_idx'),
+        ),
+    ]
@@ -8,7 +8,8 @@ import os
 from abc import abstractmethod
 from typing import Type
 from polymorphic.models import PolymorphicModel
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.conf import settings
@@ -53,8 +54,12 @@ class BaseRequest(ModifiedAtMixin, CreatedAtMixin, IdMixin, PolymorphicModel):
     start_compressing_at = models.DateTimeField(_("start compressing at"), null=True)
     compressed_at = models.DateTimeField(_("compressed at"), null=True)
     progress = models.IntegerField(_("progress"), default=0)
+    speed = models.BigIntegerField(_("speed"), null=True)
+    eta = models.IntegerField(_("eta"), null=True)
     title = models.CharField(_("title"), max_length=200, blank=True)
     data = models.JSONField(_("data"), default=dict)
+    storage_size = models.BigIntegerField(_("storage size"), default=0)
+    worker = models.CharField(_("worker"), max_length=255, blank=True)
 
     class Meta:
         """
@@ -63,6 +68,14 @@ class BaseRequest(ModifiedAtMixin, CreatedAtMixin, IdMixin, PolymorphicModel):
         """
 
         db_table = "base_request"
+        # The request list is filtered by user and optionally status or type, and ordered by (created_at, id).
+        # Interrupted requests are recovered by the worker which handled them.
+        indexes = [
+            models.Index(fields=["user", "created_at", "id"], name="base_request_user_created_idx"),
+            models.Index(fields=["user", "status", "created_at"], name="base_request_user_status_idx"),
+            models.Index(fields=["user", "polymorphic_ctype", "created_at"], name="base_request_user_type_idx"),
+            models.Index(fields=["worker", "status"], name="base_request_worker_idx"),
+        ]
 
     def get_state(self) -> "src.download.state.BaseRequestState":
         """
@@ -113,11 +126,13 @@ class BaseRequest(ModifiedAtMixin, CreatedAtMixin, IdMixin, PolymorphicModel):
 
         self.save(update_fields=update_fields)
 
-    def set_progress(self, progress: int) -> None:
+    def set_progress(self, progress: int, speed: int = None, eta: int = None) -> None:
         """
         Set the progress of the request.
 
         :param progress: An integer containing the current progress.
+        :param speed: An optional integer containing the current speed in bytes per second.
+        :param eta: An optional integer containing the estimated seconds remaining.
         :return: None
         """
         if progress != 0 and self.progress > progress:
@@ -125,7 +140,9 @@ class BaseRequest(ModifiedAtMixin, CreatedAtMixin, IdMixin, PolymorphicModel):
                 f"Progress state change to {progress} is lower than current progress state {self.progress}."
             )
         self.progress = progress
-        self.save(update_fields=["progress"])
+        self.speed = speed
+        self.eta = eta
+        self.save(update_fields=["progress", "speed", "eta"])
 
     def set_start_compressing_at(self, clear = False) -> None:
         """
@@ -156,6 +173,16 @@ class BaseRequest(ModifiedAtMixin, CreatedAtMixin, IdMixin, PolymorphicModel):
         self.title = title
         self.save(update_fields=["title"])
 
+    def set_worker(self, worker: str) -> None:
+        """
+        Set the hostname of the worker handling the request.
+
+        :param worker: A str of the worker hostname.
+        :return: None
+        """
+        self.worker = worker
+        self.save(update_fields=["worker"])
+
     def set_data(self, data: dict) -> None:
         """
         Set the data payload field.
@@ -175,6 +202,15 @@ class BaseRequest(ModifiedAtMixin, CreatedAtMixin, IdMixin, PolymorphicModel):
         """
         return f"files/{self.user.id}/{self.id}"
 
+    def is_enqueued_on_create(self) -> bool:
+        """
+        Notify whether the request is automatically handled once it has been created.
+        Can be overwritten by requests which are scheduled otherwise.
+
+        :return: a bool whether the request is enqueued on create.
+        """
+        return True
+
     def get_handler(self) -> "src.download.handlers.BaseHandler":
         """
         Initialize the associated handler with the current request and return it.
@@ -183,23 +219,37 @@ class BaseRequest(ModifiedAtMixin, CreatedAtMixin, IdMixin, PolymorphicModel):
         """
         return self.get_handler_object()(self)
 
-    @property
-    def storage_size(self) -> int:
+    def set_storage_size(self, storage_size: int) -> None:
         """
-        Calculate the total request storage size.
+        Set the storage size of the request and apply the difference to the storage size of the user.
+        The request row is locked, so concurrent updates never apply the same difference twice.
 
-        :return: The total storage size.
+        :param storage_size: An int containing the storage size in bytes.
+        :return: None
         """
-        from django.core.cache import cache
-        from .utils import calculate_storage
+        with transaction.atomic():
+            current = BaseRequest.objects.select_for_update().filter(id=self.id).values_list(
+                "storage_size", flat=True
+            ).first()
+            if current is None or current == storage_size:
+                self.storage_size = storage_size
+                return
+
+            BaseRequest.objects.filter(id=self.id).update(storage_size=storage_size)
+            self._meta.get_field("user").related_model.objects.filter(id=self.user_id).update(
+                storage_size=F("storage_size") + storage_size - current
+            )
+        self.storage_size = storage_size
 
-        storage_size = cache.get(f'{self.id}.storage_size')
+    def update_storage_size(self) -> None:
+        """
+        Measure the storage size of the request files and archive on disk and store it.
 
-        if not storage_size:
-            storage_size = calculate_storage(self.path)
-            cache.set(f'{self.id}.storage_size', storage_size, 10)
+        :return: None
+        """
+        from .utils import calculate_request_storage
 
-        return storage_size
+        self.set_storage_size(calculate_request_storage(self.path))
 
     @staticmethod
     @abstractmethod
@@ -238,6 +288,8 @@ class RequestLog(CreatedAtMixin, IdMixin):
         (LEVEL_NOTSET, ""),
     )
 
+    # Logs are written in batches, so they are stamped when created instead of when saved.
+    created_at = models.DateTimeField(_("created at"), default=timezone.now)
     request = models.ForeignKey(
         BaseRequest, verbose_name=_("request"), on_delete=models.CASCADE
     )
@@ -251,6 +303,9 @@ class RequestLog(CreatedAtMixin, IdMixin):
         """
 
         db_table = "request_log"
+        indexes = [
+            models.Index(fields=["request", "created_at"], name="request_log_req_created_idx"),
+        ]
 
     @property
     def level_display(self) -> str:
@@ -281,6 +336,7 @@ class FilesLog(CreatedAtMixin, IdMixin):
         db_table = "files_log"
         indexes = [
             models.Index(fields=['path'], name='path_idx'),
+            models.Index(fields=['created_at'], name='files_log_created_idx'),
         ]
 
     @property
@@ -0,0 +1,32 @@
+"""
+Download pagination.
+
+This file contains the cursor pagination of the request list.
+"""
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class RequestCursorPagination(CursorPagination):
+    """
+    A cursor pagination which pages through the requests from new to old by (created_at, id),
+    so every page is a single index range scan regardless of the amount of requests of a user.
+    Lists without a page size are paginated by the default page size.
+    """
+    ordering = ("-created_at", "-id")
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    @property
+    def page_size(self) -> int:
+        """
+        :return: an int containing the default page size.
+        """
+        return settings.REQUEST_PAGE_SIZE
+
+    @property
+    def max_page_size(self) -> int:
+        """
+        :return: an int containing the maximum page size.
+        """
+        return settings.REQUEST_MAX_PAGE_SIZE
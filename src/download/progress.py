@@ -0,0 +1,125 @@
+"""
+Download progress.
+
+This file contains a throttled progress reporter for use by BaseHandler objects.
+"""
+import time
+
+from django.conf import settings
+
+from .models import BaseRequest
+
+
+class ProgressReporter(object):
+    """
+    A progress reporter which coalesces progress updates of a request.
+
+    Every persisted progress update results in a database update and a websocket broadcast,
+    therefore updates are only emitted at most every PROGRESS_INTERVAL milliseconds or when the progress
+    increased with at least PROGRESS_STEP percent. The last received update is always emitted on flush().
+    The storage size of the request is updated along with the emitted progress, at most every PROGRESS_STORAGE_INTERVAL seconds.
+    """
+
+    request = None
+    interval = None
+    step = None
+
+    def __init__(self, request: BaseRequest, interval: int = None, step: int = None) -> None:
+        """
+        Initialize the progress reporter for a request.
+
+        :param request: a BaseRequest to report the progress of.
+        :param interval: an optional int of the minimum milliseconds in between emits.
+        :param step: an optional int of the minimum percentage in between emits.
+        """
+        self.request = request
+        self.interval = (settings.PROGRESS_INTERVAL if interval is None else interval) / 1000.0
+        self.step = settings.PROGRESS_STEP if step is None else step
+
+        self.progress = request.progress
+        self.pending = None
+        self.emitted_at = 0.0
+        self.measured_at = time.monotonic()
+        self.storage_interval = settings.PROGRESS_STORAGE_INTERVAL
+        self.sample = None
+        self.speed = None
+
+        super().__init__()
+
+    def update(
+            self,
+            progress: int = None,
+            downloaded: int = None,
+            total: int = None,
+            speed: int = None,
+            eta: int = None,
+    ) -> None:
+        """
+        Receive a progress update. Either the progress or the downloaded and total bytes must be given.
+        The speed and ETA are measured from the downloaded bytes when not given.
+
+        :param progress: an optional int containing the progress percentage.
+        :param downloaded: an optional int containing the downloaded bytes.
+        :param total: an optional int containing the total bytes.
+        :param speed: an optional int containing the download speed in bytes per second.
+        :param eta: an optional int containing the estimated seconds remaining.
+        :return: None
+        """
+        now = time.monotonic()
+
+        if downloaded is not None:
+            if speed is None:
+                speed = self.measure_speed(now, downloaded)
+            if progress is None and total:
+                progress = int((downloaded / int(total)) * 100)
+            if eta is None and speed and total:
+                eta = int((int(total) - downloaded) / speed)
+
+        if progress is None or progress < self.progress:
+            return
+
+        self.pending = (min(progress, 100), int(speed) if speed is not None else None, eta)
+
+        if progress - self.progress >= self.step or now - self.emitted_at >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Emit the last received progress update (if any) to the request.
+
+        :return: None
+        """
+        if self.pending is None:
+            return
+
+        progress, speed, eta = self.pending
+        self.pending = None
+        self.progress = progress
+        self.emitted_at = time.monotonic()
+
+        self.request.set_progress(progress, speed, eta)
+
+        # The files are measured far less often than the progress is emitted, as measuring walks the request folder.
+        if self.emitted_at - self.measured_at >= self.storage_interval:
+            self.measured_at = self.emitted_at
+            self.request.update_storage_size()
+
+    def measure_speed(self, now: float, downloaded: int) -> float:
+        """
+        Measure the download speed as an exponential moving average over samples of at least half a second.
+
+        :param now: a float containing the current monotonic time.
+        :param downloaded: an int containing the downloaded bytes.
+        :return: a float containing the download speed in bytes per second.
+        """
+        if self.sample is None or downloaded < self.sample[1]:
+            self.sample = (now, downloaded)
+            return self.speed
+
+        elapsed = now - self.sample[0]
+        if elapsed >= 0.5:
+            speed = (downloaded - self.sample[1]) / elapsed
+            self.speed = speed if self.speed is None else 0.3 * speed + 0.7 * self.speed
+            self.sample = (now, downloaded)
+
+        return self.speed
@@ -47,6 +47,8 @@ class BaseRequestSerializer(serializers.ModelSerializer):
             "start_compressing_at",
             "compressed_at",
             "progress",
+            "speed",
+            "eta",
             "title",
             "data",
             "path",
@@ -62,6 +64,8 @@ class BaseRequestSerializer(serializers.ModelSerializer):
             "start_compressing_at",
             "compressed_at",
             "progress",
+            "speed",
+            "eta",
             "title",
             "data",
             "path",
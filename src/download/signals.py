@@ -4,10 +4,12 @@ Download signals.
 This file contains handler functions for DB signals send by Django when performing ORM actions.
 """
 from django.dispatch import receiver
+from django.db.models import F
 from django.db.models.signals import post_save, pre_delete
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
+from src.user.models import User
 from .models import BaseRequest
 from .tasks import download_request, delete_request_files
 from .serializers import PolymorphicRequestSerializer
@@ -16,7 +18,8 @@ from .serializers import PolymorphicRequestSerializer
 @receiver(post_save)
 def handle_request_post_save(sender, instance, created, **kwargs) -> None:
     """
-    Automatically handle a BaseRequest object, after it has been created, in a asynchronous task queue.
+    Automatically handle a BaseRequest object, after it has been created, in a asynchronous task queue
+    unless it's scheduled otherwise.
     Additionally, this triggers a websocket send event to an authenticated group in order to notify members
     of the request data change.
 
@@ -28,7 +31,8 @@ def handle_request_post_save(sender, instance, created, **kwargs) -> None:
     """
     if isinstance(instance, BaseRequest):
         if created:
-            download_request.delay(instance.id)
+            if instance.is_enqueued_on_create():
+                download_request.delay(instance.id)
         else:
             async_to_sync(get_channel_layer().group_send)(
                 f"requests.group.{instance.user.id}",
@@ -45,7 +49,8 @@ def handle_request_post_save(sender, instance, created, **kwargs) -> None:
 @receiver(pre_delete)
 def handle_request_post_delete(sender, instance, using, **kwargs) -> None:
     """
-    Automatically delete request files, before it will be deleted, in an asynchronous task queue.
+    Automatically delete request files, before it will be deleted, in an asynchronous task queue
+    and subtract its storage size from the user.
 
     :param sender: models.Model object which triggered the save action.
     :param instance: a BaseRequest instance.
@@ -55,4 +60,6 @@ def handle_request_post_delete(sender, instance, using, **kwargs) -> None:
     :return:
     """
     if isinstance(instance, BaseRequest):
+        if instance.storage_size:
+            User.objects.filter(id=instance.user_id).update(storage_size=F("storage_size") - instance.storage_size)
         delete_request_files.delay(instance.path)
@@ -8,10 +8,24 @@ import uuid
 import shutil
 
 from config.celery import app
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from celery.signals import worker_ready
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
+from src.user.models import User
 from .models import BaseRequest
+from .utils import calculate_request_storage
+
+ACTIVE_STATUSES = (
+    BaseRequest.STATUS_PRE_PROCESSING,
+    BaseRequest.STATUS_DOWNLOADING,
+    BaseRequest.STATUS_POST_PROCESSING,
+)
+STORAGE_RECONCILE_KEY = "download.storage.reconcile"
 
 
 @app.task
@@ -32,6 +46,7 @@ def compress_request(request_id: uuid) -> None:
     if not os.path.isfile(f'{request.path}.zip'):
         shutil.make_archive(request.path, 'zip', request.path)
     request.set_compressed_at()
+    request.update_storage_size()
 
     async_to_sync(get_channel_layer().group_send)(
         f"requests.group.{request.user.id}",
@@ -48,20 +63,84 @@ def compress_request(request_id: uuid) -> None:
     )
 
 
-@app.task
-def download_request(request_id: uuid) -> None:
+@app.task(bind=True)
+def download_request(self, request_id: uuid) -> None:
     """
     Handle a given BaseRequest in a asynchronous task queue.
     The BaseRequest is retrieved in task instead of given as a request param in order to ensure
     no model mutations have been made and prevent conflicts.
+    The request is claimed by switching it to pre processing while locked, so a request
+    which has been queued more than once (e.g. when recovered) is only handled once.
+    The worker handling the request is recorded, so only that worker recovers it when interrupted.
 
     :param request_id: a UUID4 containing the id of a valid BaseRequest.
     :return: None
     """
-    request = BaseRequest.objects.get(id=request_id)
+    with transaction.atomic():
+        request = BaseRequest.objects.select_for_update().get(id=request_id)
+        if request.status != BaseRequest.STATUS_PENDING:
+            return
+
+        request.set_worker(self.request.hostname or "")
+        request.get_state().pre_processing()
+
     request.get_handler().handle()
 
 
+@app.task
+def recover_requests(hostname: str) -> None:
+    """
+    Recover requests which were interrupted by a shutdown or crash of a worker, by failing
+    and re-planning them. Handlers which support it will resume their partial downloads,
+    the partial files of all other handlers are removed before the request is re-planned.
+    Only requests handled by the given worker are recovered, as other workers may still be handling theirs.
+    Deferred handlers continue outside of the workers once handed off and are left alone.
+
+    :param hostname: a str containing the hostname of the (re)started worker.
+    :return: None
+    """
+    requests = BaseRequest.objects.filter(worker=hostname, status__in=ACTIVE_STATUSES)
+
+    for request_id in requests.values_list("id", flat=True):
+        with transaction.atomic():
+            # The request is locked and checked once more, as it may have changed meanwhile.
+            request = BaseRequest.objects.select_for_update().filter(id=request_id).first()
+            if request is None or request.worker != hostname or request.status not in ACTIVE_STATUSES:
+                continue
+            if request.status != BaseRequest.STATUS_PRE_PROCESSING and \
+                    request.get_handler_object().is_deferred(request):
+                continue
+
+            handler = request.get_handler()
+            request.get_state().failed()
+            request.set_progress(0)
+            if handler.resumable():
+                request.update_storage_size()
+            else:
+                # The files are removed right away, as a queued removal could remove the files of the re-run.
+                request.set_storage_size(0)
+                delete_request_files(request.path)
+            request.get_state().pending()
+            transaction.on_commit(lambda request_id=request_id: download_request.delay(request_id))
+
+
+@worker_ready.connect
+def handle_worker_ready(sender, **kwargs) -> None:
+    """
+    Plan the recovery of the interrupted requests of a worker once it has (re)started.
+    The storage sizes are reconciled once when a worker first starts (e.g. after they have been introduced),
+    instead of showing no storage until the periodic reconciliation.
+
+    :param sender: the Consumer object of the started worker.
+    :param kwargs: *
+    :return: None
+    """
+    recover_requests.delay(sender.hostname)
+
+    if cache.add(STORAGE_RECONCILE_KEY, True, None):
+        reconcile_storage.delay()
+
+
 @app.task
 def delete_request_files(path: str) -> None:
     """
@@ -73,3 +152,24 @@ def delete_request_files(path: str) -> None:
     shutil.rmtree(path, ignore_errors=True)
     if os.path.isfile(f'{path}.zip'):
         os.remove(f'{path}.zip')
+
+
+@app.task
+def reconcile_storage() -> None:
+    """
+    Correct drift in the stored storage sizes, e.g. caused by files changed outside of the handlers,
+    by measuring the storage of all requests on disk and recalculating the storage size of all users.
+
+    :return: None
+    """
+    requests = BaseRequest.objects.non_polymorphic().select_related("user").only("id", "user__id", "storage_size")
+    for request in requests.iterator():
+        storage_size = calculate_request_storage(request.path)
+        if storage_size != request.storage_size:
+            BaseRequest.objects.filter(id=request.id).update(storage_size=storage_size)
+
+    User.objects.update(storage_size=Coalesce(Subquery(
+        BaseRequest.objects.non_polymorphic().filter(user=OuterRef("id")).order_by().values("user").annotate(
+            total=Sum("storage_size")
+        ).values("total")
+    ), Value(0)))
@@ -32,6 +32,20 @@ def calculate_storage(path: str) -> int:
     return size
 
 
+def calculate_request_storage(path: str) -> int:
+    """
+    Calculate the storage for a request folder and its archive.
+
+    :param path: The request folder path to calculate
+    :return: The storage in bytes.
+    """
+    size = calculate_storage(path)
+    if os.path.isfile(f"{path}.zip"):
+        size += os.path.getsize(f"{path}.zip")
+
+    return size
+
+
 def list_files(path: str) -> list:
     """
     List all files of the given directory and recursively
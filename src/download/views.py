@@ -7,13 +7,16 @@ and use of the polymorphic serializers all registered
 handler Requests are automatically handled by this viewset.
 """
 from django.db.models import QuerySet
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, mixins
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authentication import TokenAuthentication
 
+from .filters import RequestFilterSet
 from .models import BaseRequest
+from .pagination import RequestCursorPagination
 from .serializers import PolymorphicRequestSerializer, RequestLogSerializer
 from .tasks import download_request, compress_request
 from .utils import list_files
@@ -28,12 +31,16 @@ class RequestViewSet(
 ):
     """
     A Polymorphic view set for creating, viewing and retrying Request instances and associated logs.
+    The list can be filtered and paginated by cursor, see RequestFilterSet and RequestCursorPagination.
     """
 
     queryset = BaseRequest.objects.all()
     serializer_class = PolymorphicRequestSerializer
     permission_classes = [IsAuthenticated]
     authentication_classes = [TokenAuthentication]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = RequestFilterSet
+    pagination_class = RequestCursorPagination
 
     def get_queryset(self) -> QuerySet:
         """
@@ -77,7 +84,9 @@ class RequestViewSet(
         :return: Response
         """
         request_object = self.get_object()
-        return Response(RequestLogSerializer(request_object.requestlog_set, many=True).data)
+        # Logs are never older than their request, which allows skipping older partitions.
+        logs = request_object.requestlog_set.filter(created_at__gte=request_object.created_at).order_by("created_at")
+        return Response(RequestLogSerializer(logs, many=True).data)
 
     @action(detail=True)
     def files(self, request, pk=None) -> Response:
@@ -4,9 +4,15 @@ Audio visual handlers.
 This file contains the BaseHandler implementation of the audio visual handler.
 """
 import re
+import copy
+import shlex
 import yt_dlp
 
+from django.conf import settings
+from django.db import transaction
+
 from .loggers import AudioVisualLogger
+from .tasks import schedule_playlist_entries
 from src.download.models import BaseRequest
 from src.download.handlers import BaseHandler, BaseHandlerStatus
 
@@ -17,6 +23,9 @@ class AudioVisualHandler(BaseHandler):
     """
 
     options = None
+    meta = None
+    transfers = None
+    status_ttl = 600
 
     def __init__(self, request: BaseRequest) -> None:
         """
@@ -44,17 +53,43 @@ class AudioVisualHandler(BaseHandler):
         status = BaseHandlerStatus(AudioVisualRequest.__name__)
 
         try:
-            with yt_dlp.YoutubeDL({}) as yt_dl:
-                meta = yt_dl.extract_info(url, download=False)
+            with yt_dlp.YoutubeDL({"socket_timeout": settings.HANDLER_PROBE_TIMEOUT}) as yt_dl:
+                meta = yt_dl.sanitize_info(yt_dl.extract_info(url, download=False))
                 formats = meta.get("formats", [meta])
                 status.set_supported(True)
                 status.set_options(formats)
-        except Exception:
+                status.set_data(meta)
+        except Exception as e:
             status.set_supported(False)
             status.set_options({})
+            # Only urls which no extractor supports are unsupported, other errors (e.g. network errors) are transient.
+            exc_info = getattr(e, "exc_info", None) or (None, None, None)
+            status.set_failed(not isinstance(exc_info[1], yt_dlp.utils.UnsupportedError))
 
         return status
 
+    def handle(self) -> None:
+        """
+        Handle the request and schedule the remaining entries of its playlist once it completed or failed.
+
+        :return: None
+        """
+        super().handle()
+
+        if self.request.playlist_id:
+            schedule_playlist_entries.delay(self.request.playlist_id)
+
+    @classmethod
+    def is_deferred(cls, request: BaseRequest) -> bool:
+        """
+        Notify whether the download of a request is handed off to an external process.
+        Playlists are handed off to their entries, which are downloaded as separate requests.
+
+        :param request: A BaseRequest object.
+        :return: a bool whether the download is deferred.
+        """
+        return request.entries.exists()
+
     def pre_process(self) -> None:
         """
         Additional pre-processing steps which configures the options
@@ -62,39 +97,129 @@ class AudioVisualHandler(BaseHandler):
 
         :return: None
         """
-        with yt_dlp.YoutubeDL({}) as yt_dl:
-            meta = yt_dl.extract_info(self.request.url, download=False)
-            self.request.set_data(meta)
-            self.request.set_title(meta["title"])
-
-            self.options = {
-                "verbose": True,
-                "writedescription": True,
-                "writeannotations": True,
-                "writethumbnail": True,
-                "writelink": True,
-                "writesubtitles": True,
-                "outtmpl": f"{self.request.path}/{self.request.output}",
-                "format": self.request.format_selection,
-                "logger": self.logger,
-                "progress_hooks": [self.progress_hook],
+        self.meta = self.get_probe_data()
+        if self.meta:
+            self.logger.debug("Reusing metadata retrieved when probing the url.")
+        else:
+            # Playlist entries are only extracted flat, as they are extracted by their own request.
+            with yt_dlp.YoutubeDL({"extract_flat": "in_playlist"}) as yt_dl:
+                self.meta = yt_dl.sanitize_info(yt_dl.extract_info(self.request.url, download=False))
+
+        if self.meta.get("_type") == "playlist":
+            self.request.set_data({key: value for key, value in self.meta.items() if key != "entries"})
+            self.request.set_title((self.meta.get("title") or "Playlist")[:200])
+            self.create_entries()
+            return
+
+        self.request.set_data(self.meta)
+        self.request.set_title(self.meta["title"])
+        self.transfers = {}
+
+        self.options = {
+            "verbose": True,
+            "writedescription": True,
+            "writeannotations": True,
+            "writethumbnail": True,
+            "writelink": True,
+            "writesubtitles": True,
+            "outtmpl": f"{self.request.path}/{self.request.output}",
+            "format": self.request.format_selection,
+            "logger": self.logger,
+            "progress_hooks": [self.progress_hook],
+            "concurrent_fragment_downloads": (
+                self.request.concurrent_fragments or settings.AUDIO_VISUAL_CONCURRENT_FRAGMENTS
+            ),
+        }
+
+        http_chunk_size = self.request.http_chunk_size or settings.AUDIO_VISUAL_HTTP_CHUNK_SIZE
+        if http_chunk_size:
+            self.options["http_chunk_size"] = http_chunk_size
+
+        if settings.AUDIO_VISUAL_EXTERNAL_DOWNLOADER:
+            self.options["external_downloader"] = {"default": settings.AUDIO_VISUAL_EXTERNAL_DOWNLOADER}
+            self.options["external_downloader_args"] = {
+                "default": shlex.split(settings.AUDIO_VISUAL_EXTERNAL_DOWNLOADER_ARGS)
             }
 
-            if self.request.audio_format:
-                self.options['postprocessors'] = [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': self.request.audio_format,
-                }]
+        if self.request.audio_format:
+            self.options['postprocessors'] = [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': self.request.audio_format,
+            }]
 
     def download(self) -> None:
         """
         Additional download steps which
-        download the audio visual request using youtube-dl.
+        download the audio visual request using youtube-dl,
+        or schedule the entries of a playlist request.
 
         :return: None
         """
+        if self.is_deferred(self.request):
+            schedule_playlist_entries.delay(self.request.id)
+            return
+
         with yt_dlp.YoutubeDL(self.options) as yt_dl:
-            yt_dl.download([self.request.url])
+            try:
+                # Process the already extracted metadata instead of extracting it once more.
+                yt_dl.process_ie_result(copy.deepcopy(self.meta), download=True)
+            except yt_dlp.utils.DownloadError:
+                self.logger.warning("Failed to download from the extracted metadata. Retrying with a new extraction.")
+                yt_dl.download([self.request.url])
+
+    def create_entries(self) -> None:
+        """
+        Create a request for every entry of the playlist, with the same options as the playlist request.
+        All entries are created at once, so entries which were created by a previous attempt are complete
+        and reused, and their failed entries are retried.
+
+        :return: None
+        """
+        from .models import AudioVisualRequest
+
+        if self.request.entries.exists():
+            failed = self.request.entries.filter(status=BaseRequest.STATUS_FAILED)
+            for entry in failed:
+                entry.get_state().pending()
+            self.logger.info(f"Reusing the previously created playlist entries, retrying {len(failed)} failed entries.")
+            return
+
+        count = 0
+        with transaction.atomic():
+            for entry in self.meta.get("entries") or []:
+                url = entry.get("webpage_url") or entry.get("url")
+                if not url:
+                    continue
+
+                AudioVisualRequest.objects.create(
+                    user=self.request.user,
+                    url=url,
+                    title=(entry.get("title") or "")[:200],
+                    format_selection=self.request.format_selection,
+                    output=self.request.output,
+                    audio_format=self.request.audio_format,
+                    concurrent_fragments=self.request.concurrent_fragments,
+                    http_chunk_size=self.request.http_chunk_size,
+                    playlist=self.request,
+                )
+                count += 1
+
+        if not count:
+            raise Exception("The playlist doesn't contain any entries.")
+        self.logger.info(f"Created {count} playlist entries.")
+
+    @staticmethod
+    def get_expected_size(d: dict) -> int:
+        """
+        Get the expected size of all formats which are downloaded for the request, when known.
+
+        :param d: dict
+        :return: an int containing the expected size in bytes or 0 when unknown.
+        """
+        formats = d.get("info_dict", {}).get("requested_formats") or []
+        sizes = [f.get("filesize") or f.get("filesize_approx") for f in formats]
+
+        return sum(sizes) if sizes and all(sizes) else 0
 
     def progress_hook(self, d: dict) -> None:
         """
@@ -104,12 +229,18 @@ class AudioVisualHandler(BaseHandler):
         :param d: dict
         :return: None
         """
-        if "_percent_str" in d:
+        total = d.get("total_bytes") or d.get("total_bytes_estimate")
+        if d.get("downloaded_bytes") is not None and total:
+            # Formats which are merged afterwards (e.g. video and audio) are downloaded one after another,
+            # each reporting their own (fragment aggregated) progress, so progress is tracked per file.
+            self.transfers[d.get("filename")] = (d["downloaded_bytes"], total)
+            downloaded = sum(transfer[0] for transfer in self.transfers.values())
+            total = max(sum(transfer[1] for transfer in self.transfers.values()), self.get_expected_size(d))
+            self.reporter.update(downloaded=downloaded, total=total, speed=d.get("speed"), eta=d.get("eta"))
+        elif "_percent_str" in d:
             matches = re.findall("\d+\.?\d+", d["_percent_str"])
             if len(matches):
-                progress = int(float(matches[0]))
-                if progress > self.request.progress:
-                    self.request.set_progress(progress)
+                self.reporter.update(progress=int(float(matches[0])), speed=d.get("speed"), eta=d.get("eta"))
 
         if d['status'] == 'finished':
             self.request.get_state().post_processing
@@ -0,0 +1,24 @@
+# Generated by Django 5.0 on 2026-10-18 17:51
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audio_visual', '0002_audiovisualrequest_audio_format'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audiovisualrequest',
+            name='concurrent_fragments',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(16)], verbose_name='concurrent fragments'),
+        ),
+        migrations.AddField(
+            model_name='audiovisualrequest',
+            name='http_chunk_size',
+            field=models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1048576)], verbose_name='http chunk size'),
+        ),
+    ]
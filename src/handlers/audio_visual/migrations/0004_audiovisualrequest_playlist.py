@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-18 17:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audio_visual', '0003_audiovisualrequest_fragments_chunk_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audiovisualrequest',
+            name='playlist',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='audio_visual.audiovisualrequest', verbose_name='playlist'),
+        ),
+    ]
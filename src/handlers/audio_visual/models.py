@@ -6,6 +6,7 @@ This file contains the BaseRequest implementation for the audio visual handler.
 from typing import Type
 
 from django.db import models
+from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
 
 from .handlers import AudioVisualHandler
@@ -21,6 +22,16 @@ class AudioVisualRequest(BaseRequest):
     format_selection = models.CharField(_("format selection"), max_length=50)
     output = models.CharField(_("output"), max_length=100)
     audio_format = models.CharField(_("audio format"), max_length=20, null=True)
+    # Fragment concurrency and HTTP chunk size (in bytes) fall back to the deployment settings when empty.
+    concurrent_fragments = models.PositiveSmallIntegerField(
+        _("concurrent fragments"), null=True, blank=True, validators=[MinValueValidator(1), MaxValueValidator(16)]
+    )
+    http_chunk_size = models.PositiveIntegerField(
+        _("http chunk size"), null=True, blank=True, validators=[MinValueValidator(1024 * 1024)]
+    )
+    playlist = models.ForeignKey(
+        "self", verbose_name=_("playlist"), related_name="entries", on_delete=models.CASCADE, null=True, blank=True
+    )
 
     class Meta:
         """
@@ -39,3 +50,12 @@ class AudioVisualRequest(BaseRequest):
         :return: a Type[BaseHandler] of the BaseHandler object.
         """
         return AudioVisualHandler
+
+    def is_enqueued_on_create(self) -> bool:
+        """
+        Notify whether the request is automatically handled once it has been created.
+        Playlist entries are scheduled by their playlist instead.
+
+        :return: a bool whether the request is enqueued on create.
+        """
+        return self.playlist_id is None
@@ -7,7 +7,7 @@ from .models import AudioVisualRequest
 
 from src.download.serializers import BaseRequestSerializer
 
-CUSTOM_FIELDS = ("format_selection", "output", "audio_format")
+CUSTOM_FIELDS = ("format_selection", "output", "audio_format", "concurrent_fragments", "http_chunk_size")
 
 class AudioVisualRequestSerializer(BaseRequestSerializer):
     """
@@ -21,6 +21,6 @@ class AudioVisualRequestSerializer(BaseRequestSerializer):
         """
 
         model = AudioVisualRequest
-        fields = BaseRequestSerializer.Meta.fields + CUSTOM_FIELDS
-        read_only_fields = BaseRequestSerializer.Meta.read_only_fields
+        fields = BaseRequestSerializer.Meta.fields + CUSTOM_FIELDS + ("playlist",)
+        read_only_fields = BaseRequestSerializer.Meta.read_only_fields + ("playlist",)
         extra_kwargs = {"user": {"write_only": True}}
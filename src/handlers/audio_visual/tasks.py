@@ -0,0 +1,104 @@
+"""
+Audio visual tasks.
+
+This file contains the Celery tasks which schedule the entries of playlist requests across workers.
+"""
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from celery.signals import worker_ready
+
+from config.celery import app
+from src.download.models import BaseRequest
+from src.download.tasks import ACTIVE_STATUSES, download_request
+
+TERMINAL_STATUSES = (BaseRequest.STATUS_COMPLETED, BaseRequest.STATUS_FAILED)
+
+
+@app.task
+def schedule_playlist_entries(playlist_id: uuid) -> None:
+    """
+    Schedule the pending entries of a playlist request, limited by the playlist concurrency,
+    aggregate the progress of all entries and finish the playlist once all entries have completed or failed.
+    The playlist row is locked, so concurrently finishing entries neither exceed the concurrency nor finish it twice.
+
+    :param playlist_id: a UUID4 containing the id of a downloading playlist AudioVisualRequest.
+    :return: None
+    """
+    from .models import AudioVisualRequest
+
+    with transaction.atomic():
+        playlist = AudioVisualRequest.objects.select_for_update().filter(id=playlist_id).first()
+        if playlist is None or playlist.status != BaseRequest.STATUS_DOWNLOADING:
+            return
+
+        entries = list(playlist.entries.order_by("created_at").values_list("id", "status", "progress"))
+        pending = [entry_id for entry_id, status, _ in entries if status == BaseRequest.STATUS_PENDING]
+        active = sum(1 for _, status, _ in entries if status in ACTIVE_STATUSES)
+
+        # Entries which have been scheduled, but haven't been picked up by a worker yet, count as active.
+        scheduled = [entry_id for entry_id in pending if str(entry_id) in playlist.data.get("scheduled", [])]
+        available = settings.AUDIO_VISUAL_PLAYLIST_CONCURRENCY - active - len(scheduled)
+        schedule = [entry_id for entry_id in pending if entry_id not in scheduled][:max(available, 0)]
+
+        playlist.data = {**playlist.data, "scheduled": [str(entry_id) for entry_id in scheduled + schedule]}
+        playlist.save(update_fields=["data"])
+
+        for entry_id in schedule:
+            transaction.on_commit(lambda entry_id=entry_id: download_request.delay(entry_id))
+
+        # Finished entries count as fully progressed, as failed entries are reset to no progress.
+        if entries:
+            progress = int(sum(
+                100 if status in TERMINAL_STATUSES else progress for _, status, progress in entries
+            ) / len(entries))
+            if progress > playlist.progress:
+                playlist.set_progress(progress)
+
+        if all(status in TERMINAL_STATUSES for _, status, _ in entries):
+            handler = playlist.get_handler()
+            failed = sum(1 for _, status, _ in entries if status == BaseRequest.STATUS_FAILED)
+
+            if entries and failed == len(entries):
+                handler.fail(Exception("All playlist entries have failed."))
+            else:
+                if failed:
+                    handler.logger.warning(f"{failed} of {len(entries)} playlist entries have failed.")
+                handler.logger.info("All playlist entries have finished.")
+                handler.finish()
+
+            # A playlist which is an entry of another playlist frees up a slot of its parent once finished.
+            if playlist.playlist_id:
+                transaction.on_commit(lambda: schedule_playlist_entries.delay(playlist.playlist_id))
+
+
+@app.task
+def recover_playlist_entries() -> None:
+    """
+    Queue the scheduled entries of downloading playlists once more when they're still pending, as their task
+    may have been lost (e.g. when a worker crashed before starting it), which would stall the playlist forever.
+    Entries whose task wasn't lost are only handled once, as the download task claims the entry.
+
+    :return: None
+    """
+    from .models import AudioVisualRequest
+
+    playlists = AudioVisualRequest.objects.filter(status=BaseRequest.STATUS_DOWNLOADING, entries__isnull=False)
+    for playlist in playlists.distinct():
+        scheduled = playlist.data.get("scheduled", [])
+        entries = playlist.entries.filter(id__in=scheduled, status=BaseRequest.STATUS_PENDING)
+        for entry_id in entries.values_list("id", flat=True):
+            download_request.delay(entry_id)
+
+
+@worker_ready.connect
+def handle_worker_ready(sender, **kwargs) -> None:
+    """
+    Plan the recovery of the scheduled playlist entries once a worker has (re)started.
+
+    :param sender: the Consumer object of the started worker.
+    :param kwargs: *
+    :return: None
+    """
+    recover_playlist_entries.delay()
@@ -0,0 +1,134 @@
+"""
+Handlers cache.
+
+This file contains the cache of handler statuses, so repeated probes for the same url
+don't repeat network requests and metadata extraction, as well as the cache of probe data
+for reuse when a request for a probed url is created by the same user.
+"""
+import json
+import hashlib
+
+from collections.abc import Mapping
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from django.conf import settings
+from django.core.cache import cache
+
+from src.download.handlers import BaseHandlerStatus
+
+HITS_KEY = "handlers.status.hits"
+MISSES_KEY = "handlers.status.misses"
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a url so equivalent urls share a cache key. The scheme and host are lowercased,
+    default ports and fragments are removed and query parameters are sorted.
+
+    :param url: a str containing a valid url.
+    :return: a str containing the normalized url.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+
+    if parts.port and DEFAULT_PORTS.get(scheme) == parts.port:
+        netloc = netloc.rsplit(":", 1)[0]
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+    return urlunsplit((scheme, netloc, parts.path or ("/" if netloc else ""), query, ""))
+
+
+def get_cache_key(request: str, url: str, prefix: str = "handlers.status") -> str:
+    """
+    Get the cache key of a handler status (or other prefixed handler data) for a url.
+
+    :param request: a str containing the name of the BaseRequest the handler status belongs to.
+    :param url: a str containing a valid url.
+    :param prefix: an optional str containing the cache key prefix.
+    :return: a str containing the cache key.
+    """
+    return f"{prefix}.{request}.{hashlib.sha1(normalize_url(url).encode()).hexdigest()}"
+
+
+def count(key: str) -> None:
+    """
+    Increment a cache counter.
+
+    :param key: a str containing the counter cache key.
+    :return: None
+    """
+    cache.add(key, 0, None)
+    cache.incr(key)
+
+
+def get_cached_status(request: str, url: str) -> dict:
+    """
+    Retrieve a cached handler status and count the cache hit or miss.
+
+    :param request: a str containing the name of the BaseRequest the handler status belongs to.
+    :param url: a str containing a valid url.
+    :return: a dict containing the cached handler status or None when not cached.
+    """
+    status = cache.get(get_cache_key(request, url))
+    count(HITS_KEY if status is not None else MISSES_KEY)
+
+    return status
+
+
+def set_cached_status(handler: type, url: str, status: dict) -> None:
+    """
+    Cache a handler status using the TTLs of the handler. Unknown statuses are never cached.
+
+    :param handler: the type of the BaseHandler which determined the status.
+    :param url: a str containing a valid url.
+    :param status: a dict containing the handler status.
+    :return: None
+    """
+    if status["state"] == BaseHandlerStatus.STATE_UNKNOWN:
+        return
+
+    ttl = handler.status_ttl if status["supported"] else handler.unsupported_status_ttl
+    if ttl:
+        # Handler options may contain library objects, store them as plain json data instead.
+        status = json.loads(json.dumps(status, default=lambda o: dict(o) if isinstance(o, Mapping) else str(o)))
+        cache.set(get_cache_key(status["request"], url), status, ttl)
+
+
+def get_cached_probe_data(request: str, user_id, url: str) -> dict:
+    """
+    Retrieve cached probe data of a user.
+
+    :param request: a str containing the name of the BaseRequest the probe data belongs to.
+    :param user_id: the id of the user who probed the url.
+    :param url: a str containing a valid url.
+    :return: a dict containing the probe data or None when not cached.
+    """
+    return cache.get(get_cache_key(request, url, f"handlers.probe.{user_id}"))
+
+
+def set_cached_probe_data(request: str, user_id, url: str, data: dict) -> None:
+    """
+    Briefly cache probe data per user, as probe data may be large and (e.g. yt-dlp metadata) depend on the session
+    it was retrieved with, so it's only reused for requests of the user who probed the url.
+
+    :param request: a str containing the name of the BaseRequest the probe data belongs to.
+    :param user_id: the id of the user who probed the url.
+    :param url: a str containing a valid url.
+    :param data: a dict containing the probe data.
+    :return: None
+    """
+    cache.set(get_cache_key(request, url, f"handlers.probe.{user_id}"), data, settings.HANDLER_PROBE_DATA_TTL)
+
+
+def get_cache_stats() -> dict:
+    """
+    Get the handler status cache hit and miss counters.
+
+    :return: a dict containing the hits and misses.
+    """
+    return {
+        "hits": cache.get(HITS_KEY, 0),
+        "misses": cache.get(MISSES_KEY, 0),
+    }
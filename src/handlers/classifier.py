@@ -0,0 +1,101 @@
+"""
+Handlers classifier.
+
+This file contains an offline url classifier, which determines which handlers can't
+possibly support a url without performing any network requests.
+"""
+import re
+import os
+
+from functools import lru_cache
+from urllib.parse import urlsplit, unquote
+
+MAGNET_REGEX = re.compile(r"magnet:\?xt=urn:btih:[a-zA-Z0-9]*")
+# Schemes supported by requests, used by the direct and resource handlers.
+NETWORK_SCHEMES = ("http", "https")
+
+# Extensions of streamable media, which are handled by the audio visual and direct handlers.
+MEDIA_EXTENSIONS = {
+    "mp4", "m4v", "mkv", "webm", "mov", "avi", "flv", "wmv", "mpg", "mpeg", "ts", "3gp",
+    "mp3", "m4a", "aac", "ogg", "oga", "opus", "flac", "wav", "wma", "m3u8", "mpd",
+}
+
+# Extensions of files that can only be handled by the direct handler.
+FILE_EXTENSIONS = {
+    "zip", "rar", "7z", "tar", "gz", "tgz", "bz2", "xz", "zst", "iso", "img", "dmg", "exe", "msi",
+    "deb", "rpm", "apk", "appimage", "bin", "jar", "pdf", "epub", "doc", "docx", "xls", "xlsx", "ppt",
+    "pptx", "odt", "csv", "txt", "jpg", "jpeg", "png", "gif", "webp", "bmp", "svg", "ico",
+    "torrent", "srt", "vtt",
+}
+
+
+@lru_cache(maxsize=None)
+def get_extractor_index() -> tuple:
+    """
+    Build the index of compiled url patterns of all yt-dlp extractors, excluding the generic extractor.
+    The index is built once per process.
+
+    :return: a tuple containing (extractor key, compiled patterns) tuples.
+    """
+    from yt_dlp.extractor import gen_extractor_classes
+    from yt_dlp.utils import variadic
+
+    return tuple(
+        (ie.ie_key(), tuple(re.compile(pattern) for pattern in variadic(ie._VALID_URL)))
+        for ie in gen_extractor_classes()
+        if ie.ie_key() != "Generic" and ie._VALID_URL
+    )
+
+
+def match_extractor(url: str) -> str:
+    """
+    Match a url against the extractor index.
+
+    :param url: a str containing a valid url.
+    :return: a str containing the key of the first matching extractor or None.
+    """
+    for key, patterns in get_extractor_index():
+        if any(pattern.match(url) for pattern in patterns):
+            return key
+
+    return None
+
+
+def get_extension(url: str) -> str:
+    """
+    Get the (lowercase) file extension of the url path.
+
+    :param url: a str containing a valid url.
+    :return: a str containing the extension without a leading dot or an empty str.
+    """
+    return os.path.splitext(unquote(urlsplit(url).path))[1][1:].lower()
+
+
+def classify(url: str) -> set:
+    """
+    Classify a url and determine which handlers can't support it. Handlers are only excluded
+    when their probe can't reasonably succeed for the scheme or file extension of the url.
+    Urls matching a specific yt-dlp extractor are always probed by all handlers.
+
+    :param url: a str containing a valid url.
+    :return: a set containing the names of the requests whose handlers don't need to be probed.
+    """
+    from src.handlers.audio_visual.models import AudioVisualRequest
+    from src.handlers.direct.models import DirectRequest
+    from src.handlers.resource.models import ResourceRequest
+
+    network = {AudioVisualRequest.__name__, DirectRequest.__name__, ResourceRequest.__name__}
+
+    if MAGNET_REGEX.search(url):
+        return network
+    elif urlsplit(url).scheme.lower() not in NETWORK_SCHEMES:
+        return {DirectRequest.__name__, ResourceRequest.__name__}
+
+    extension = get_extension(url)
+    if extension not in MEDIA_EXTENSIONS | FILE_EXTENSIONS or match_extractor(url):
+        return set()
+
+    if extension in MEDIA_EXTENSIONS:
+        return {ResourceRequest.__name__}
+
+    return {AudioVisualRequest.__name__, ResourceRequest.__name__}
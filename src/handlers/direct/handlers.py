@@ -3,10 +3,15 @@ Direct handlers.
 
 This file contains the BaseHandler implementation of the direct handler.
 """
+import os
 import requests
 
+from django.conf import settings
+
 from src.download.handlers import BaseHandler, BaseHandlerStatus
-from ..utils import create_resource_folder, extract_file_extension, extract_filename, download_request
+from ..sessions import get_session
+from ..utils import create_resource_folder, extract_file_extension, extract_filename, download_request, \
+    supports_ranges, get_manifest_path
 
 
 class DirectHandler(BaseHandler):
@@ -16,6 +21,7 @@ class DirectHandler(BaseHandler):
 
     extension = None
     filename = None
+    headers = None
 
     @staticmethod
     def handles(url: str) -> BaseHandlerStatus:
@@ -31,10 +37,13 @@ class DirectHandler(BaseHandler):
         status.set_options({})
 
         try:
-            r = requests.head(url, allow_redirects=True)
+            r = get_session().head(url, allow_redirects=True, timeout=settings.HANDLER_PROBE_TIMEOUT)
             status.set_supported(r.status_code == requests.codes.ok)
-        except (requests.exceptions.ConnectionError, requests.exceptions.InvalidSchema):
+            status.set_failed(r.status_code >= 500)
+            status.set_data(dict(r.headers))
+        except requests.exceptions.RequestException:
             status.set_supported(False)
+            status.set_failed(True)
 
         return status
 
@@ -45,12 +54,16 @@ class DirectHandler(BaseHandler):
 
         :return: None
         """
-        r = requests.head(self.request.url, allow_redirects=True)
-        self.request.set_data(dict(r.headers))
-        self.logger.debug("Retrieved header information.")
+        self.headers = self.get_probe_data()
+        if self.headers:
+            self.logger.debug("Reusing header information retrieved when probing the url.")
+        else:
+            self.headers = dict(get_session().head(self.request.url, allow_redirects=True).headers)
+            self.logger.debug("Retrieved header information.")
+        self.request.set_data(self.headers)
 
-        self.extension = extract_file_extension(dict(r.headers))
-        self.filename = extract_filename(self.request.url, dict(r.headers), self.extension)
+        self.extension = extract_file_extension(self.headers)
+        self.filename = extract_filename(self.request.url, self.headers, self.extension)
         self.request.set_title(self.filename)
         self.logger.debug(
             f"Extracted extension {self.extension} and filename/title {self.filename}."
@@ -66,14 +79,42 @@ class DirectHandler(BaseHandler):
 
         :return: None
         """
-        def progress_cb(progress: int) -> None:
-            if progress > self.request.progress:
-                self.request.set_progress(progress)
+        def progress_cb(downloaded: int, total: int) -> None:
+            self.reporter.update(downloaded=downloaded, total=total)
 
-        self.logger.debug(f"Started download for {self.request.url}.")
-        result = download_request(self.request.url, self.request.path, self.filename, self.extension, progress_cb)
+        if self.request.connections > 1 and supports_ranges(self.headers):
+            self.logger.debug(f"Started download for {self.request.url} over {self.request.connections} connections.")
+        else:
+            self.logger.debug(f"Started download for {self.request.url}.")
+
+        result = download_request(
+            self.request.url,
+            self.request.path,
+            self.filename,
+            self.extension,
+            progress_cb,
+            self.request.connections,
+            self.headers,
+        )
 
         if result.get("success"):
             self.logger.info(f"Finished download with {', '.join('{} {}'.format(k,v) for k,v in result.items())}.")
         else:
-            self.logger.error(f"Failed download with {', '.join('{} {}'.format(k,v) for k,v in result.items())}.")
+            raise Exception(f"Failed download with {', '.join('{} {}'.format(k,v) for k,v in result.items())}.")
+
+    def resumable(self) -> bool:
+        """
+        Notify whether a partial download with a sidecar manifest exists which can be resumed on retry.
+        The manifest validators are checked against the resource when the download restarts.
+        Requests which are recovered haven't been pre-processed by this handler, so their filename
+        is extracted from the headers stored by the interrupted attempt instead.
+
+        :return: a bool whether the files must be kept.
+        """
+        if self.filename is None and self.request.data:
+            extension = extract_file_extension(self.request.data)
+            filename = extract_filename(self.request.url, self.request.data, extension)
+        else:
+            extension, filename = self.extension, self.filename
+
+        return bool(filename) and os.path.isfile(get_manifest_path(self.request.path, filename, extension))
@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-18 17:30
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('direct', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='directrequest',
+            name='connections',
+            field=models.PositiveSmallIntegerField(default=4, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(16)], verbose_name='connections'),
+        ),
+    ]
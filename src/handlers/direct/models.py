@@ -5,6 +5,10 @@ This file contains the BaseRequest implementation for the direct handler.
 """
 from typing import Type
 
+from django.db import models
+from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils.translation import gettext_lazy as _
+
 from .handlers import DirectHandler
 from src.download.models import BaseRequest
 from src.download.handlers import BaseHandler
@@ -15,6 +19,10 @@ class DirectRequest(BaseRequest):
     A direct handler request model which implements the BaseRequest object.
     """
 
+    connections = models.PositiveSmallIntegerField(
+        _("connections"), default=4, validators=[MinValueValidator(1), MaxValueValidator(16)]
+    )
+
     class Meta:
         """
         Model metadata.
@@ -7,11 +7,13 @@ from .models import DirectRequest
 
 from src.download.serializers import BaseRequestSerializer
 
+CUSTOM_FIELDS = ("connections",)
 
 class DirectRequestSerializer(BaseRequestSerializer):
     """
     Direct request serializer.
     """
+    excluded_fields = BaseRequestSerializer.excluded_fields + CUSTOM_FIELDS
 
     class Meta:
         """
@@ -19,6 +21,6 @@ class DirectRequestSerializer(BaseRequestSerializer):
         """
 
         model = DirectRequest
-        fields = BaseRequestSerializer.Meta.fields
+        fields = BaseRequestSerializer.Meta.fields + CUSTOM_FIELDS
         read_only_fields = BaseRequestSerializer.Meta.read_only_fields
         extra_kwargs = {"user": {"write_only": True}}
@@ -0,0 +1,3 @@
+"""
+Handlers management init.
+"""
@@ -0,0 +1,3 @@
+"""
+Handlers commands init.
+"""
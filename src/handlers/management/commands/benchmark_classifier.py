@@ -0,0 +1,124 @@
+"""
+handlers command.
+
+This file contains the benchmark_classifier command.
+"""
+import os
+import time
+import random
+
+from collections import Counter
+from django.core.management.base import BaseCommand, CommandError
+
+from src.download.models import BaseRequest
+from src.download.serializers import PolymorphicRequestSerializer
+from src.handlers.classifier import classify, get_extractor_index
+
+
+def generate_urls(amount: int, seed: int) -> list:
+    """
+    Generate a (deterministic) synthetic corpus of urls resembling submitted requests,
+    with video platform urls, direct media and file links, web pages, magnet links and other schemes.
+
+    :param amount: an int containing the amount of urls.
+    :param seed: an int containing the random seed.
+    :return: a list containing the urls.
+    """
+    rnd = random.Random(seed)
+    hosts = ["example.com", "files.example.org", "cdn.example.net", "downloads.example.io"]
+
+    def token(length: int) -> str:
+        return "".join(rnd.choice("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-") for _ in range(length))
+
+    kinds = [
+        lambda: f"https://www.youtube.com/watch?v={token(11)}",
+        lambda: f"https://vimeo.com/{rnd.randrange(10 ** 8)}",
+        lambda: f"https://soundcloud.com/{token(8).lower()}/{token(12).lower()}",
+        lambda: f"https://{rnd.choice(hosts)}/media/{token(10)}.{rnd.choice(['mp4', 'mkv', 'mp3', 'webm', 'm3u8'])}",
+        lambda: f"https://{rnd.choice(hosts)}/files/{token(10)}.{rnd.choice(['zip', 'pdf', 'iso', 'tar.gz', 'jpg'])}",
+        lambda: f"https://{rnd.choice(hosts)}/blog/{token(12).lower()}",
+        lambda: f"https://{rnd.choice(hosts)}/{token(6).lower()}/index.html",
+        lambda: f"magnet:?xt=urn:btih:{''.join(rnd.choice('0123456789abcdef') for _ in range(40))}",
+        lambda: f"ftp://{rnd.choice(hosts)}/pub/{token(10)}.zip",
+    ]
+
+    return [rnd.choice(kinds)() for _ in range(amount)]
+
+
+class Command(BaseCommand):
+    help = 'Measure the handler probes skipped by the offline url classifier'
+
+    def add_arguments(self, parser):
+        """
+        Add the command arguments.
+
+        :param parser: *
+        :return: None
+        """
+        parser.add_argument("--urls", help="A file containing a url per line, instead of the generated corpus.")
+        parser.add_argument("--amount", type=int, default=10000, help="The amount of generated urls.")
+        parser.add_argument(
+            "--probe",
+            action="store_true",
+            help="Also run the skipped probes, to measure their time and verify none of them would be supported.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Start the benchmark_classifier command.
+
+        :param args: *
+        :param options: *
+        :return: None
+        """
+        if options["urls"]:
+            if not os.path.isfile(options["urls"]):
+                raise CommandError(f"{options['urls']} isn't a file.")
+            with open(options["urls"]) as f:
+                urls = [line.strip() for line in f if line.strip()]
+        else:
+            urls = generate_urls(options["amount"], 0)
+
+        handlers = [handler for handler in PolymorphicRequestSerializer.model_serializer_mapping if handler is not BaseRequest]
+
+        started = time.perf_counter()
+        get_extractor_index()
+        self.stdout.write(f"Built the extractor index in {time.perf_counter() - started:.2f} s.")
+
+        skipped = Counter()
+        classified = {}
+        started = time.perf_counter()
+        for url in urls:
+            classified[url] = classify(url)
+            skipped.update(classified[url])
+        seconds = time.perf_counter() - started
+
+        probes = len(urls) * len(handlers)
+        self.stdout.write(
+            f"Classified {len(urls)} urls in {seconds:.2f} s ({seconds / len(urls) * 1000 * 1000:.1f} µs per url)."
+        )
+        self.stdout.write(
+            f"Skipped {sum(skipped.values())} of {probes} probes ({sum(skipped.values()) / probes:.1%})."
+        )
+        for handler in handlers:
+            self.stdout.write(f"  {handler.__name__:<20} {skipped[handler.__name__]:7} skipped")
+
+        if not options["probe"]:
+            return
+
+        supported = 0
+        started = time.perf_counter()
+        for handler in handlers:
+            for url, excluded in classified.items():
+                if handler.__name__ in excluded:
+                    try:
+                        status = handler.get_handler_object().handles(url)
+                    except Exception:
+                        continue
+                    if status.supported:
+                        supported += 1
+                        self.stdout.write(self.style.WARNING(f"  {handler.__name__} supports skipped {url}"))
+        self.stdout.write(
+            f"Running the skipped probes took {time.perf_counter() - started:.2f} s, "
+            f"{supported} of them would have been supported."
+        )
@@ -0,0 +1,148 @@
+"""
+handlers command.
+
+This file contains the benchmark_download command.
+"""
+import time
+import tempfile
+import threading
+import requests
+
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from src.handlers.sessions import get_session
+from src.handlers.utils import download_response
+
+
+class BenchmarkRequestHandler(BaseHTTPRequestHandler):
+    """
+    A request handler serving files of the size given in the path (e.g. /1024/file.bin).
+    """
+
+    protocol_version = "HTTP/1.1"
+    body = b""
+    connect_delay = 0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self) -> None:
+        """
+        Count every new connection, after delaying it to emulate the (TCP and TLS) handshakes of remote hosts.
+
+        :return: None
+        """
+        time.sleep(self.connect_delay)
+        with self.lock:
+            BenchmarkRequestHandler.connections += 1
+        super().setup()
+
+    def send_file_headers(self) -> int:
+        """
+        Send the status and headers of the requested file.
+
+        :return: an int containing the file size.
+        """
+        size = int(self.path.split("/")[1])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+
+        return size
+
+    def do_HEAD(self) -> None:
+        self.send_file_headers()
+
+    def do_GET(self) -> None:
+        size = self.send_file_headers()
+        body = memoryview(self.body)
+        for start in range(0, size, len(body)):
+            self.wfile.write(body[:min(len(body), size - start)])
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Compare the direct and resource download throughput with and without pooled HTTP sessions'
+
+    def add_arguments(self, parser):
+        """
+        Add the command arguments.
+
+        :param parser: *
+        :return: None
+        """
+        parser.add_argument("--files", type=int, default=5, help="The amount of direct downloads.")
+        parser.add_argument("--file-size", type=float, default=50, help="The size (in MB) of every direct download.")
+        parser.add_argument("--assets", type=int, default=200, help="The amount of resource assets.")
+        parser.add_argument("--asset-size", type=float, default=64, help="The size (in KB) of every resource asset.")
+        parser.add_argument(
+            "--connect-delay", type=float, default=20, help="The delay (in ms) of every new connection."
+        )
+
+    def handle(self, *args, **options):
+        """
+        Start the benchmark_download command, which serves generated files from a local server
+        and downloads them the way the direct handler (probe, pre-process and download)
+        and the resource handler (concurrent assets) do.
+
+        :param args: *
+        :param options: *
+        :return: None
+        """
+        BenchmarkRequestHandler.body = b"\0" * 1024 * 1024
+        BenchmarkRequestHandler.connect_delay = options["connect_delay"] / 1000
+        server = ThreadingHTTPServer(("127.0.0.1", 0), BenchmarkRequestHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+
+        file_size = int(options["file_size"] * 1024 * 1024)
+        asset_size = int(options["asset_size"] * 1024)
+        modes = (
+            ("unpooled", requests.head, requests.get),
+            ("pooled", lambda *a, **kw: get_session().head(*a, **kw), lambda *a, **kw: get_session().get(*a, **kw)),
+        )
+
+        try:
+            with tempfile.TemporaryDirectory() as path:
+                for label, head, get in modes:
+                    def direct(i: int) -> int:
+                        file_url = f"{url}/{file_size}/file-{i}.bin"
+                        head(file_url, allow_redirects=True)
+                        head(file_url, allow_redirects=True)
+                        with get(file_url, stream=True) as r:
+                            return download_response(r, path, f"file-{i}", ".bin").get("downloaded", 0)
+
+                    def asset(i: int) -> int:
+                        with get(f"{url}/{asset_size}/asset-{i}.bin", stream=True) as r:
+                            return download_response(r, path, f"asset-{i}", ".bin").get("downloaded", 0)
+
+                    self.stdout.write(label)
+                    self.measure("direct", lambda: sum(direct(i) for i in range(options["files"])))
+                    with ThreadPoolExecutor(max_workers=settings.RESOURCE_MAX_WORKERS) as executor:
+                        self.measure("resource", lambda: sum(executor.map(asset, range(options["assets"]))))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def measure(self, label: str, download) -> None:
+        """
+        Measure and print the throughput and opened connections of a download function.
+
+        :param label: a str containing the label to print.
+        :param download: a callable downloading the files and returning the downloaded bytes.
+        :return: None
+        """
+        BenchmarkRequestHandler.connections = 0
+        started = time.perf_counter()
+        downloaded = download()
+        seconds = time.perf_counter() - started
+        self.stdout.write(
+            f"  {label:<8} {seconds:6.2f} s {downloaded / 1024 / 1024 / seconds:8.1f} MB/s "
+            f"{BenchmarkRequestHandler.connections:5} connections"
+        )
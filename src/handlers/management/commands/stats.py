@@ -0,0 +1,42 @@
+"""
+handlers command.
+
+This file contains the stats command.
+"""
+from django.core.management.base import BaseCommand
+
+from src.handlers.cache import get_cache_stats
+from src.handlers.resource.browser import get_browser_stats
+
+
+class Command(BaseCommand):
+    help = 'Show the handler status cache and browser pool metrics shared by all workers'
+
+    def handle(self, *args, **options):
+        """
+        Start the stats command, which prints the handler status cache hits and misses,
+        the browser session counters and the pool occupancy per process.
+
+        :param args: *
+        :param options: *
+        :return: None
+        """
+        statuses = get_cache_stats()
+        lookups = statuses["hits"] + statuses["misses"]
+        self.stdout.write(
+            f"Handler status cache: {statuses['hits']} hits, {statuses['misses']} misses "
+            f"({statuses['hits'] / lookups if lookups else 0:.1%} hit rate)."
+        )
+
+        browsers = get_browser_stats()
+        self.stdout.write(
+            f"Browser sessions: {browsers['created']} created, {browsers['reused']} reused, "
+            f"{browsers['recycled']} recycled."
+        )
+
+        if not browsers["occupancy"]:
+            self.stdout.write("Browser pools: no recently used pools.")
+        for process, stats in sorted(browsers["occupancy"].items()):
+            self.stdout.write(
+                f"Browser pool {process}: {stats['in_use']} in use, {stats['idle']} idle of {stats['size']}."
+            )
@@ -0,0 +1,329 @@
+"""
+Resource browser.
+
+This file contains the pool of warm Selenium Server browser sessions shared by resource handlers
+within a worker process, which are reset between requests and recycled after a number of uses or on a crash.
+"""
+import atexit
+import logging
+import os
+import socket
+import threading
+
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import cache
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from ..cache import count
+
+logger = logging.getLogger(__name__)
+
+STATS_PREFIX = "handlers.resource.browsers"
+PROCESSES_KEY = f"{STATS_PREFIX}.processes"
+# The occupancy of a process expires when its pool hasn't been used for an hour (e.g. after the process died).
+OCCUPANCY_TTL = 3600
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def configure_chrome_options() -> webdriver.ChromeOptions:
+    """
+    Configure chrome options for Selenium Server.
+
+    :return: a ChromeOptions object.
+    """
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-features=NetworkService")
+    chrome_options.add_argument("--disable-features=VizDisplayCompositor")
+    chrome_options.add_argument('--window-size=1920,1080')
+    # The performance log contains the network events used to capture the requested resources.
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    return chrome_options
+
+
+class BrowserSession(object):
+    """
+    A Selenium Server browser session and the amount of requests it has been used for.
+    """
+
+    driver = None
+    uses = None
+
+    def __init__(self) -> None:
+        """
+        Initialize the browser session by starting a new Selenium Server session.
+        """
+        self.driver = webdriver.Remote(
+            command_executor=settings.RESOURCE_BROWSER_URL,
+            options=configure_chrome_options(),
+        )
+        self.driver.set_page_load_timeout(30)
+        self.uses = 0
+
+        super().__init__()
+
+    def healthy(self) -> bool:
+        """
+        Check whether the browser session is still alive and responsive.
+
+        :return: a bool indicating whether the session is healthy.
+        """
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except WebDriverException:
+            return False
+
+    def reset(self) -> None:
+        """
+        Reset the browser session state, by closing all but the first window,
+        navigating to a blank page, clearing the cookies and storage of every origin
+        (including third parties, redirects and frames) and draining the performance log.
+
+        :return: None
+        """
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+
+        self.driver.get("about:blank")
+        # WebDriver only clears the cookies and storage of the current origin, the DevTools protocol clears them all.
+        self.execute_cdp("Network.clearBrowserCookies", {})
+        self.execute_cdp("Storage.clearDataForOrigin", {"origin": "*", "storageTypes": "all"})
+        self.drain()
+
+    def execute_cdp(self, cmd: str, params: dict) -> dict:
+        """
+        Execute a Chrome DevTools Protocol command through the Selenium Server.
+
+        :param cmd: a str containing the command name.
+        :param params: a dict containing the command parameters.
+        :return: a dict containing the command result.
+        """
+        return self.driver.execute("executeCdpCommand", {"cmd": cmd, "params": params})["value"]
+
+    def drain(self) -> None:
+        """
+        Discard the buffered performance log, which otherwise builds up in the Selenium Server
+        for sessions which aren't used to capture the network.
+
+        :return: None
+        """
+        self.driver.get_log("performance")
+
+    def quit(self) -> None:
+        """
+        Quit the browser session, ignoring sessions which already crashed.
+
+        :return: None
+        """
+        try:
+            self.driver.quit()
+        except WebDriverException:
+            pass
+
+
+class BrowserPool(object):
+    """
+    A pool of warm browser sessions, limited to a maximum amount of concurrently used sessions.
+    """
+
+    size = None
+    max_uses = None
+    stats_key = None
+
+    def __init__(self, size: int, max_uses: int) -> None:
+        """
+        Initialize the (empty) pool, sessions are created once acquired.
+
+        :param size: an int of the maximum concurrently used sessions.
+        :param max_uses: an int of the requests a session is used for before it's recycled.
+        """
+        self.size = size
+        self.max_uses = max_uses
+        self.idle = []
+        self.in_use = 0
+        self.lock = threading.Lock()
+        self.semaphore = threading.BoundedSemaphore(size)
+        self.stats_key = f"{STATS_PREFIX}.occupancy.{socket.gethostname()}.{os.getpid()}"
+
+        super().__init__()
+
+    @contextmanager
+    def acquire(self):
+        """
+        Acquire a browser session from the pool, waiting for a session to become
+        available when all sessions are in use. Idle sessions are health checked before reuse
+        and replaced by a new session when unhealthy.
+
+        :return: a Remote webdriver object.
+        """
+        self.semaphore.acquire()
+        session = None
+        try:
+            session = self.checkout()
+            yield session.driver
+        except WebDriverException:
+            if session is not None:
+                self.discard(session, "crashed")
+                session = None
+            raise
+        finally:
+            if session is not None:
+                self.checkin(session)
+            with self.lock:
+                self.in_use -= 1
+            self.semaphore.release()
+            self.log_stats()
+
+    def checkout(self) -> BrowserSession:
+        """
+        Take a healthy idle session from the pool, with an empty performance log, or create a new one.
+
+        :return: a BrowserSession object.
+        """
+        with self.lock:
+            self.in_use += 1
+
+        while True:
+            with self.lock:
+                session = self.idle.pop() if self.idle else None
+            if session is None:
+                break
+            if session.healthy():
+                try:
+                    session.drain()
+                except WebDriverException:
+                    self.discard(session, "crashed")
+                    continue
+                count(f"{STATS_PREFIX}.reused")
+                return session
+            self.discard(session, "unhealthy")
+
+        session = BrowserSession()
+        count(f"{STATS_PREFIX}.created")
+        logger.debug("Created a new browser session.")
+
+        return session
+
+    def checkin(self, session: BrowserSession) -> None:
+        """
+        Return a session to the pool after resetting it, or recycle it
+        when it reached the maximum amount of uses or could not be reset.
+
+        :param session: a BrowserSession object.
+        :return: None
+        """
+        session.uses += 1
+        if session.uses >= self.max_uses:
+            self.discard(session, "exhausted")
+            return
+
+        try:
+            session.reset()
+        except WebDriverException:
+            self.discard(session, "crashed")
+            return
+
+        with self.lock:
+            self.idle.append(session)
+
+    def discard(self, session: BrowserSession, reason: str) -> None:
+        """
+        Quit a session and count it as recycled.
+
+        :param session: a BrowserSession object.
+        :param reason: a str containing the reason for recycling the session.
+        :return: None
+        """
+        session.quit()
+        count(f"{STATS_PREFIX}.recycled")
+        logger.debug(f"Recycled browser session after {session.uses} uses ({reason}).")
+
+    def close(self) -> None:
+        """
+        Quit all idle sessions and remove the pool occupancy of the current process.
+
+        :return: None
+        """
+        with self.lock:
+            sessions, self.idle = self.idle, []
+        for session in sessions:
+            session.quit()
+
+        cache.delete(self.stats_key)
+
+    def get_stats(self) -> dict:
+        """
+        Get the pool occupancy of the current process.
+
+        :return: a dict containing the pool size, used and idle sessions.
+        """
+        with self.lock:
+            return {"size": self.size, "in_use": self.in_use, "idle": len(self.idle)}
+
+    def log_stats(self) -> None:
+        """
+        Log the pool occupancy and store it in the cache per process.
+
+        :return: None
+        """
+        stats = self.get_stats()
+        cache.set(self.stats_key, stats, OCCUPANCY_TTL)
+
+        # Processes are registered so their occupancy can be retrieved, expired ones are removed once retrieved.
+        processes = cache.get(PROCESSES_KEY, [])
+        if self.stats_key not in processes:
+            cache.set(PROCESSES_KEY, processes + [self.stats_key], None)
+
+        logger.info(f"Browser pool occupancy: {stats['in_use']} in use, {stats['idle']} idle of {stats['size']}.")
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    Get the browser pool of the current process. A new pool is created
+    after the process has been forked, as sessions can't be shared between processes.
+
+    :return: a BrowserPool object.
+    """
+    global _pool, _pool_pid
+
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = BrowserPool(settings.RESOURCE_BROWSER_POOL_SIZE, settings.RESOURCE_BROWSER_MAX_USES)
+                _pool_pid = os.getpid()
+                atexit.register(_pool.close)
+
+    return _pool
+
+
+def get_browser_stats() -> dict:
+    """
+    Get the browser session counters and the pool occupancy of every process which recently used its pool.
+
+    :return: a dict containing the created, reused and recycled sessions and the occupancy per process.
+    """
+    processes = cache.get(PROCESSES_KEY, [])
+    occupancy = cache.get_many(processes)
+    if len(occupancy) < len(processes):
+        cache.set(PROCESSES_KEY, [
+            key for key in cache.get(PROCESSES_KEY, []) if key in occupancy or key not in processes
+        ], None)
+
+    return {
+        "created": cache.get(f"{STATS_PREFIX}.created", 0),
+        "reused": cache.get(f"{STATS_PREFIX}.reused", 0),
+        "recycled": cache.get(f"{STATS_PREFIX}.recycled", 0),
+        "occupancy": {key.split(".occupancy.", 1)[1]: stats for key, stats in occupancy.items()},
+    }
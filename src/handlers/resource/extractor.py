@@ -0,0 +1,108 @@
+"""
+Resource handler extractor.
+
+This file contains the single pass tokenizer which extracts the paths of all resources linked in a html page.
+"""
+import re
+
+from html import unescape
+from urllib.parse import urljoin, urlsplit
+
+SCHEMES = ("http", "https", "ftp")
+BASE_REGEX = re.compile(r"<base\b[^>]*\bhref\s*=\s*[\"']?([^\"'\s>]+)", re.IGNORECASE)
+# Each token is either an url attribute (href, src, srcset, ...), a CSS url() declaration,
+# an absolute url or a quoted relative path (e.g. within scripts). As the leftmost token wins,
+# attribute values and CSS declarations are never matched twice by the later alternatives.
+TOKEN_REGEX = re.compile(
+    r"\b(?P<attr>href|src|data-src|poster|action|srcset|data-srcset|imagesrcset)\s*=\s*"
+    r"(?:\"(?P<dq>[^\"]*)\"|'(?P<sq>[^']*)'|(?P<uq>[^\s\"'>]+))"
+    r"|url\(\s*[\"']?(?P<css>[^\"')\s]+)"
+    r"|(?P<abs>(?:https?|ftp)://[\w-]+(?:\.[\w-]+)+(?:[\w.,@?^=%&:/~+#-]*[\w@?^=%&/~+#-])?)"
+    r"|[\"'](?P<rel>(?://?|(?:\.\./)+)[\w.-][\w.,@?^=%&:/~+#-]*)[\"']",
+    re.IGNORECASE,
+)
+
+
+def resolve(base: tuple, path: str) -> str:
+    """
+    Resolve a path against a base url, avoiding the (comparatively slow) urljoin for absolute
+    and root relative paths, and drop the fragment.
+
+    :param base: a tuple containing the base url, its scheme and its origin.
+    :param path: a str containing an absolute or relative path.
+    :return: a str containing the absolute path or None for non network schemes.
+    """
+    url, scheme, origin = base
+
+    if path.startswith("//"):
+        path = f"{scheme}:{path}"
+    elif path.startswith("/"):
+        path = f"{origin}{path}"
+    elif not path.startswith(("http://", "https://")):
+        path = urljoin(url, path)
+        if path.split(":", 1)[0].lower() not in SCHEMES:
+            return None
+
+    return path.split("#", 1)[0]
+
+
+def extract_paths(page: str, url: str) -> list:
+    """
+    Extract the unique paths of all resources linked in a html page in a single pass,
+    resolving and deduplicating every path into a single dict while scanning.
+
+    :param page: a str containing the html.
+    :param url: a str containing the url of the page, used to resolve relative paths.
+    :return: a list containing the absolute paths in order of appearance.
+    """
+    m = BASE_REGEX.search(page)
+    if m:
+        url = urljoin(url, unescape(m.group(1)))
+    split = urlsplit(url)
+    base = (url, split.scheme, f"{split.scheme}://{split.netloc}")
+
+    paths = {}
+
+    def add(path: str) -> None:
+        if path and path[0] != "#":
+            path = resolve(base, path)
+            if path:
+                paths[path] = None
+
+    for m in TOKEN_REGEX.finditer(page):
+        attr = m.group("attr")
+        if attr is None:
+            add(m.group("css") or m.group("abs") or m.group("rel"))
+            continue
+
+        value = m.group("dq") or m.group("sq") or m.group("uq")
+        if not value:
+            continue
+        if "&" in value:
+            value = unescape(value)
+        if attr.lower().endswith("srcset"):
+            for candidate in value.split(","):
+                add(candidate.strip().split(" ", 1)[0])
+        else:
+            add(value.strip())
+
+    return list(paths)
+
+
+def filter_paths(paths: list, extensions: list) -> list:
+    """
+    Filter paths down to those without a file extension or with one of the given extensions.
+
+    :param paths: a list containing absolute paths.
+    :param extensions: a list containing the allowed extensions.
+    :return: a list containing the filtered paths.
+    """
+    extensions = tuple(extensions)
+    filtered_paths = []
+
+    for path in paths:
+        p = urlsplit(path).path
+        if "." not in p.rsplit("/", 1)[-1] or p.endswith(extensions):
+            filtered_paths.append(path)
+
+    return filtered_paths
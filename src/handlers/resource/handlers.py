@@ -3,15 +3,21 @@ Resource handlers.
 
 This file contains the BaseHandler implementation of the resource handler.
 """
-import re
 import requests
+import threading
 import time
 
-from urllib.parse import urljoin
-from selenium import webdriver
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.db import connection
 
 from src.download.handlers import BaseHandler, BaseHandlerStatus
-from ..utils import create_resource_folder, extract_file_extension, extract_filename, download_request
+from ..sessions import get_session
+from ..utils import create_resource_folder, extract_file_extension, extract_filename, download_response
+from .browser import get_browser_pool
+from .extractor import extract_paths, filter_paths
+from .utils import HostLimiter, SETTLE_STATE_SCRIPT, SCROLL_STEP_SCRIPT, extract_title, requires_browser, parse_network_log
 
 
 class ResourceHandler(BaseHandler):
@@ -22,6 +28,11 @@ class ResourceHandler(BaseHandler):
     driver = None
     html = None
     paths = None
+    settle = None
+    render_mode = None
+    resources = None
+    filenames = None
+    filenames_lock = None
 
     @staticmethod
     def handles(url: str) -> BaseHandlerStatus:
@@ -37,96 +48,182 @@ class ResourceHandler(BaseHandler):
         status.set_options({})
 
         try:
-            r = requests.head(url, allow_redirects=True)
+            r = get_session().head(url, allow_redirects=True, timeout=settings.HANDLER_PROBE_TIMEOUT)
             status.set_supported(
-                r.headers["content-type"].startswith("text/html")
+                r.headers.get("content-type", "").startswith("text/html")
                 and r.status_code == requests.codes.ok
             )
-        except (requests.exceptions.ConnectionError, requests.exceptions.InvalidSchema):
+            status.set_failed(r.status_code >= 500)
+        except requests.exceptions.RequestException:
             status.set_supported(False)
+            status.set_failed(True)
 
         return status
 
     def pre_process(self) -> None:
         """
-        Additional pre-processing steps which
-        loads the external url in a Chromium instance
-        connected and managed by Selenium Server in order to
-        extracts the html and title from the request raw data
+        Additional pre-processing steps which extracts the html and title
+        from the request raw data, either by a plain HTTP request for static pages
+        or by loading the external url in a Chromium instance connected and managed by Selenium Server,
         and prepares the filepath(s).
 
         :return: None
         """
-        self.driver = webdriver.Remote(
-            command_executor="http://selenium:4444/wd/hub",
-            options=self.configure_chrome_options(),
-        )
-        self.driver.set_page_load_timeout(30)
-        self.logger.debug("Setup Selenium webdriver connection instance.")
+        self.settle = {}
+        self.render_mode = self.request.render_mode
+
+        if self.render_mode == self.request.RENDER_MODE_STATIC:
+            self.load_static()
+            self.extract_paths()
+        elif self.render_mode == self.request.RENDER_MODE_AUTO:
+            try:
+                self.load_static()
+            except requests.exceptions.RequestException as e:
+                # Plain HTTP clients are commonly refused (e.g. by bot protection), while a browser is not.
+                self.logger.info(f"Failed to fetch static html ({str(e)}), rendering in browser instead.")
+                self.render_mode = self.request.RENDER_MODE_BROWSER
+            else:
+                self.extract_paths()
+                if requires_browser(self.html, self.paths, settings.RESOURCE_STATIC_MIN_TEXT):
+                    self.logger.info("Static html seems to be rendered by javascript, rendering in browser instead.")
+                    self.render_mode = self.request.RENDER_MODE_BROWSER
+                else:
+                    self.render_mode = self.request.RENDER_MODE_STATIC
+                    self.request.set_data({**self.request.data, "render_mode": self.render_mode})
+
+        create_resource_folder(self.request.path)
+        self.logger.debug(f"Created folder for resource.")
+
+        if self.render_mode == self.request.RENDER_MODE_BROWSER:
+            self.load_browser()
 
-        self.logger.debug(f"Loading {self.request.url} in Selenium Server instance...")
-        self.driver.get(self.request.url)
-        self.logger.info(f"Finished loading in Selenium Server instance. Sleeping 10 seconds to allow scripts to complete...")
-        time.sleep(10)
+    def load_static(self) -> None:
+        """
+        Fetch the html and title of the external url by a plain HTTP request.
 
-        self.driver.execute_script("window.scrollBy(0, document.body.scrollHeight)")
-        self.logger.info(f"Scrolling down to bottom of page. Sleeping 10 seconds to allow scripts to complete...")
-        time.sleep(10)
+        :return: None
+        """
+        self.logger.debug(f"Fetching static html of {self.request.url}...")
+        with get_session().get(self.request.url, timeout=settings.HANDLER_PROBE_TIMEOUT) as r:
+            r.raise_for_status()
+            self.html = r.text
 
-        self.html = self.driver.page_source
-        title = self.driver.title
+        title = extract_title(self.html)
         self.request.set_title(
-            title if title else "Page has no title"
+            title[:200] if title else "Page has no title"
         )
-        self.logger.info(f"Extracted browser rendered html and title '{self.request.title}'.")
+        self.logger.info(f"Extracted static html and title '{self.request.title}'.")
 
-        self.extract_paths()
+    def load_browser(self) -> None:
+        """
+        Load the external url in a Chromium instance connected and managed by Selenium Server,
+        extract the browser rendered html and title, and save a screenshot.
 
-        create_resource_folder(self.request.path)
-        self.logger.debug(f"Created folder for resource.")
+        :return: None
+        """
+        with get_browser_pool().acquire() as self.driver:
+            self.logger.debug("Acquired Selenium webdriver session from browser pool.")
+
+            self.logger.debug(f"Loading {self.request.url} in Selenium Server instance...")
+            self.driver.get(self.request.url)
+            self.settle["load"] = self.wait_for_settle(settings.RESOURCE_SETTLE_TIMEOUT)
+            self.logger.info(f"Finished loading in Selenium Server instance. Page settled in {self.settle['load']} seconds.")
+
+            self.settle["scroll"] = self.scroll_to_bottom(settings.RESOURCE_SETTLE_TIMEOUT)
+            self.logger.info(f"Scrolled down to bottom of page. Page settled in {self.settle['scroll']} seconds.")
+
+            if self.request.capture_network:
+                self.resources = parse_network_log(self.driver.get_log("performance"))
+                self.logger.info(f"Captured {len(self.resources)} resources from the browser network log.")
+
+            self.html = self.driver.page_source
+            title = self.driver.title
+            self.request.set_title(
+                title if title else "Page has no title"
+            )
+            self.logger.info(f"Extracted browser rendered html and title '{self.request.title}'.")
+
+            self.extract_paths()
 
-        self.driver.execute_script("window.scrollTo(0, 0)")
-        self.save_screenshot()
-        self.logger.info("Created and saved screenshot.")
+            self.driver.execute_script("window.scrollTo(0, 0)")
+            self.save_screenshot()
+            self.logger.info("Created and saved screenshot.")
 
-        self.driver.quit()
-        self.logger.debug("Quit the Selenium Server instance and closed all associated windows.")
+        self.driver = None
+        self.logger.debug("Released the Selenium webdriver session to the browser pool.")
 
     def download(self) -> None:
         """
-        Additional download steps which extracts
-        all paths from the resource, trims and
-        filterers them according to the given
-        extensions and additionally removes duplicates.
+        Additional download steps which downloads
+        all extracted paths concurrently, while limiting
+        the connections and delay per host.
 
         :return: None
         """
-        for i, path in enumerate(self.paths):
+        limiter = HostLimiter(self.request.max_connections, self.request.delay / 1000.0)
+        self.filenames = set()
+        self.filenames_lock = threading.Lock()
+
+        def fetch(path: str) -> int:
             try:
-                self.download_file(path)
+                with limiter.acquire(path):
+                    return self.download_file(path)
             except Exception as e:
                 self.logger.error(f'Failed to process url {path} ({str(e)})')
+                return 0
+            finally:
+                connection.close()
+
+        completed = 0
+        downloaded = 0
+        with ThreadPoolExecutor(max_workers=settings.RESOURCE_MAX_WORKERS) as executor:
+            for future in as_completed([executor.submit(fetch, path) for path in self.paths]):
+                completed += 1
+                downloaded += future.result()
+                self.reporter.update(progress=int((completed / len(self.paths)) * 100), downloaded=downloaded)
 
-            self.request.set_progress(int(((i + 1) / len(self.paths)) * 100))
-            time.sleep(self.request.delay / 1000.0)
+        self.logger.info(f"Processed {completed} paths and downloaded {downloaded} bytes.")
 
-    def configure_chrome_options(self) -> webdriver.ChromeOptions:
+    def wait_for_settle(self, timeout: float) -> float:
         """
-        Configure chrome options for Selenium Server.
+        Wait until the page has settled, meaning the document has completed loading and no DOM mutations
+        nor network requests have occurred during the settle idle time, or until the timeout passed.
 
-        :return: a ChromeOptions object.
+        :param timeout: A float containing the maximum seconds to wait.
+        :return: A float containing the seconds it took for the page to settle.
         """
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--disable-features=NetworkService")
-        chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-        chrome_options.add_argument('--window-size=1920,1080')
-        self.logger.debug("Setup Selenium Server configuration.")
+        started = time.monotonic()
+
+        while time.monotonic() - started < timeout:
+            state = self.driver.execute_script(SETTLE_STATE_SCRIPT)
+            last_activity = max(state["lastMutation"], state["lastResponse"])
+            if state["readyState"] == "complete" and state["now"] - last_activity >= settings.RESOURCE_SETTLE_IDLE:
+                break
+            time.sleep(0.1)
 
-        return chrome_options
+        return round(time.monotonic() - started, 2)
+
+    def scroll_to_bottom(self, timeout: float) -> float:
+        """
+        Incrementally scroll down the page a viewport at a time, allowing lazy loaded content
+        to load and settle, until the bottom of the page is reached or the timeout passed.
+
+        :param timeout: A float containing the maximum seconds to scroll.
+        :return: A float containing the seconds it took to scroll and settle.
+        """
+        started = time.monotonic()
+
+        for _ in range(settings.RESOURCE_SCROLL_MAX_STEPS):
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+
+            bottom = self.driver.execute_script(SCROLL_STEP_SCRIPT)
+            self.wait_for_settle(remaining)
+            if bottom:
+                break
+
+        return round(time.monotonic() - started, 2)
 
     def save_screenshot(self):
         """
@@ -137,91 +234,118 @@ class ResourceHandler(BaseHandler):
 
     def extract_paths(self) -> None:
         """
-        Extracts all paths from the resource, trims and
-        filterers them according to the given
-        extensions and additionally removes duplicates.
+        Extracts all unique paths from the resource in a single pass
+        and filters them according to the given extensions.
 
         :return: None
         """
-        paths = []
+        paths = extract_paths(self.html, self.request.url)
+        self.logger.debug(f"Extracted {len(paths)} paths.")
 
-        # Extract all absolute paths.
-        for m in re.finditer(
-                r"(http|ftp|https)(:\/\/)([\w_-]+(?:(?:\.[\w_-]+)+))([\w.,@?^=%&:\/~+#-]*[\w@?^=%&\/~+#-])?",
-                self.html
-        ):
-            paths.append(m.group())
+        filtered_paths = filter_paths(paths, self.request.extensions)
+        if self.resources is not None:
+            filtered_paths = self.filter_resources(filtered_paths)
 
-        # Extract all relative paths and join with request url.
-        for m in re.finditer(r"(\"|')(\/[\w\.\-]+)+\/?", self.html):
-            paths.append(urljoin(self.request.url, m.group()[1:]))
-        for m in re.finditer(r"(\"|')(..\/)+([\w\.\-\/]+)+(\"|')", self.html):
-            paths.append(urljoin(self.request.url, m.group()[1:]))
+        self.logger.debug(f"Filtered down to {len(filtered_paths)} paths.")
+        self.request.set_data({
+            "paths": paths,
+            "filtered_paths": filtered_paths,
+            "settle": self.settle,
+            "render_mode": self.render_mode,
+            "resources": len(self.resources) if self.resources is not None else None,
+        })
 
-        # Extract all absolute paths and prepend with request url schema.
-        for m in re.finditer(r"(\"|')(\/\/)([\w|.|\/]+)+", self.html,):
-            paths.append(urljoin(self.request.url, m.group()[1:]))
+        self.paths = filtered_paths
 
-        self.logger.debug(f"Extracted {len(paths)} paths.")
+    def filter_resources(self, paths: list) -> list:
+        """
+        Select the resources captured from the browser network log which match
+        the chosen extensions and minimum size, without any additional requests.
+        Extracted paths which weren't requested by the browser are only kept
+        when they have a file extension (e.g. links to files).
 
-        # Trim endings
-        paths = [
-            path.strip("\"'") for path in paths
-        ]
+        :param paths: A list containing the filtered extracted paths.
+        :return: A list containing the selected paths.
+        """
+        selected = {}
 
-        # filter
-        filtered_paths = [
-            path for path in paths if (
-                    ("." not in path.split('?')[0].split("/")[-1]) or
-                    ("." in path.split('?')[0].split("/")[-1] and path.split('?')[0].endswith(tuple(self.request.extensions)))
-            )
-        ]
+        for url, resource in self.resources.items():
+            extension = extract_file_extension({"Content-Type": resource["mime"]})
+            if (
+                resource["status"] == requests.codes.ok
+                and extension is not None
+                and extension.replace(".", "") in self.request.extensions
+                and (resource["size"] is None or resource["size"] >= self.request.min_bytes)
+            ):
+                selected[url] = None
 
-        # Remove duplicates
-        filtered_paths = list(dict.fromkeys(filtered_paths))
+        for path in paths:
+            if path not in self.resources and "." in urlsplit(path).path.rsplit("/", 1)[-1]:
+                selected[path] = None
 
-        self.logger.debug(f"Filtered down to {len(filtered_paths)} paths.")
-        self.request.set_data({"paths": paths, "filtered_paths": filtered_paths})
+        self.logger.debug(f"Selected {len(selected)} paths from the browser network log.")
 
-        self.paths = filtered_paths
+        return list(selected)
 
-    def download_file(self, url: str) -> None:
+    def download_file(self, url: str) -> int:
         """
         Generate the filename and extension of an url
         resource and download the file accordingly.
 
         :param url: A str containing a valid url resource.
-        :return: None
+        :return: An int containing the amount of downloaded bytes.
         """
         self.logger.debug(f"Processing url {url}.")
 
-        r = requests.head(url, allow_redirects=True)
-
-        size = r.headers.get("content-length")
-        if size is None:
-            self.logger.warn(f"Resource has no given file size. Downloading anyway.")
-        elif int(size) < self.request.min_bytes:
-            self.logger.warn(f"Resource file is too small ({size} bytes). Skipping.")
-            return
-
-        extension = extract_file_extension(dict(r.headers))
-        if extension is None:
-            self.logger.warn(f"Resource has no given content type. Downloading anyway.")
-        elif extension.replace(".", "") not in self.request.extensions:
-            self.logger.warn(f"Content type extension ({extension}) doesn't match chosen extensions. Skipping.")
-            return
-
-        r = requests.get(url, stream=True)
-
-        filename = extract_filename(url, dict(r.headers), extension)
-        self.logger.debug(
-            f"Extracted extension {extension} and filename {filename}."
-        )
+        # A single streaming request is used to filter on the headers before downloading the body.
+        # Leaving the context without reading the body aborts the transfer.
+        with get_session().get(url, stream=True) as r:
+            if r.status_code != requests.codes.ok:
+                self.logger.warn(f"Resource returned status {r.status_code}. Skipping.")
+                return 0
+
+            size = r.headers.get("content-length")
+            if size is None:
+                self.logger.warn(f"Resource has no given file size. Downloading anyway.")
+            elif int(size) < self.request.min_bytes:
+                self.logger.warn(f"Resource file is too small ({size} bytes). Skipping.")
+                return 0
+
+            extension = extract_file_extension(dict(r.headers))
+            if extension is None:
+                self.logger.warn(f"Resource has no given content type. Downloading anyway.")
+            elif extension.replace(".", "") not in self.request.extensions:
+                self.logger.warn(f"Content type extension ({extension}) doesn't match chosen extensions. Skipping.")
+                return 0
+
+            filename = self.reserve_filename(extract_filename(url, dict(r.headers), extension), extension)
+            self.logger.debug(
+                f"Extracted extension {extension} and filename {filename}."
+            )
 
-        self.logger.debug(f"Started download.")
-        result = download_request(url, self.request.path, filename, extension)
+            self.logger.debug(f"Started download.")
+            result = download_response(r, self.request.path, filename, extension)
 
         if result.get("success"):
             self.logger.info(f"Finished download with {', '.join('{} {}'.format(k,v) for k,v in result.items())}.")
         else:
             self.logger.error(f"Failed download with {', '.join('{} {}'.format(k,v) for k,v in result.items())}.")
+
+        return result.get("downloaded", 0)
+
+    def reserve_filename(self, filename: str, extension: str) -> str:
+        """
+        Reserve a unique filename for a resource, as resources are downloaded concurrently
+        and different urls may share the same filename.
+
+        :param filename: A str containing the extracted filename.
+        :param extension: A str containing the extracted extension.
+        :return: A str containing the reserved filename.
+        """
+        with self.filenames_lock:
+            reserved, i = filename, 1
+            while f"{reserved}{extension}" in self.filenames:
+                reserved, i = f"{filename} ({i})", i + 1
+            self.filenames.add(f"{reserved}{extension}")
+
+        return reserved
@@ -0,0 +1,3 @@
+"""
+Resource handler management init.
+"""
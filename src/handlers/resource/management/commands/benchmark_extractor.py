@@ -0,0 +1,142 @@
+"""
+resource command.
+
+This file contains the benchmark_extractor command.
+"""
+import os
+import re
+import time
+import random
+import tracemalloc
+
+from urllib.parse import urljoin
+from django.core.management.base import BaseCommand, CommandError
+
+from src.handlers.resource.extractor import extract_paths, filter_paths
+
+EXTENSIONS = ["html", "css", "js", "png", "jpg", "svg", "woff2"]
+
+
+def legacy_extract_paths(page: str, url: str, extensions: list) -> list:
+    """
+    The previous (multi pass) path extraction, kept for comparison.
+
+    :param page: a str containing the html.
+    :param url: a str containing the url of the page.
+    :param extensions: a list containing the allowed extensions.
+    :return: a list containing the filtered paths.
+    """
+    paths = []
+
+    for m in re.finditer(
+            r"(http|ftp|https)(:\/\/)([\w_-]+(?:(?:\.[\w_-]+)+))([\w.,@?^=%&:\/~+#-]*[\w@?^=%&\/~+#-])?", page
+    ):
+        paths.append(m.group())
+    for m in re.finditer(r"(\"|')(\/[\w\.\-]+)+\/?", page):
+        paths.append(urljoin(url, m.group()[1:]))
+    for m in re.finditer(r"(\"|')(..\/)+([\w\.\-\/]+)+(\"|')", page):
+        paths.append(urljoin(url, m.group()[1:]))
+    for m in re.finditer(r"(\"|')(\/\/)([\w|.|\/]+)+", page):
+        paths.append(urljoin(url, m.group()[1:]))
+
+    paths = [path.strip("\"'") for path in paths]
+    filtered_paths = [
+        path for path in paths if (
+                ("." not in path.split('?')[0].split("/")[-1]) or
+                ("." in path.split('?')[0].split("/")[-1] and path.split('?')[0].endswith(tuple(extensions)))
+        )
+    ]
+
+    return list(dict.fromkeys(filtered_paths))
+
+
+def extract_filtered_paths(page: str, url: str, extensions: list) -> list:
+    """
+    The current (single pass) path extraction.
+
+    :param page: a str containing the html.
+    :param url: a str containing the url of the page.
+    :param extensions: a list containing the allowed extensions.
+    :return: a list containing the filtered paths.
+    """
+    return filter_paths(extract_paths(page, url), extensions)
+
+
+def generate_page(size: int, seed: int) -> str:
+    """
+    Generate a (deterministic) synthetic page resembling a large saved page, with repeated navigation,
+    image galleries with srcsets, inline styles and scripts containing paths.
+
+    :param size: an int containing the approximate page size in bytes.
+    :param seed: an int containing the random seed.
+    :return: a str containing the html.
+    """
+    rnd = random.Random(seed)
+    hosts = ["https://cdn.example.com", "https://static.example.org", "//assets.example.net"]
+    parts = ['<html><head><base href="/site/"><link rel="stylesheet" href="/css/main.css"></head><body>']
+    length = sum(len(part) for part in parts)
+
+    while length < size:
+        n = rnd.randrange(2000)
+        host = rnd.choice(hosts)
+        part = rnd.choice([
+            f'<a href="/page/{n}.html">Page {n}</a><a href="../archive/{n % 50}/">Archive</a>',
+            f'<img src="{host}/img/{n}.jpg" srcset="{host}/img/{n}-1x.jpg 1x, {host}/img/{n}-2x.jpg 2x" alt="">',
+            f'<div style="background: url(\'/img/bg/{n % 100}.png\')">{"lorem ipsum " * rnd.randrange(1, 20)}</div>',
+            f'<script>var asset = "/js/chunk-{n % 300}.js"; fetch("{host}/api/items?page={n}&amp;size=20");</script>',
+            f'<p>{"dolor sit amet " * rnd.randrange(5, 50)}<a href="#section-{n}">#</a></p>',
+        ])
+        parts.append(part)
+        length += len(part)
+
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+class Command(BaseCommand):
+    help = 'Compare the time and peak memory of the previous and current resource path extraction'
+
+    def add_arguments(self, parser):
+        """
+        Add the command arguments.
+
+        :param parser: *
+        :return: None
+        """
+        parser.add_argument("--pages", help="A folder of saved html pages, instead of the generated corpus.")
+        parser.add_argument("--sizes", default="1,4,8", help="Comma separated sizes (in MB) of the generated corpus.")
+        parser.add_argument("--url", default="https://www.example.com/site/index.html", help="The url of the pages.")
+
+    def handle(self, *args, **options):
+        """
+        Start the benchmark_extractor command.
+
+        :param args: *
+        :param options: *
+        :return: None
+        """
+        if options["pages"]:
+            if not os.path.isdir(options["pages"]):
+                raise CommandError(f"{options['pages']} isn't a folder.")
+            corpus = []
+            for name in sorted(os.listdir(options["pages"])):
+                with open(os.path.join(options["pages"], name), encoding="utf-8", errors="replace") as f:
+                    corpus.append((name, f.read()))
+        else:
+            corpus = [
+                (f"generated-{size}mb", generate_page(int(float(size) * 1024 * 1024), i))
+                for i, size in enumerate(options["sizes"].split(","))
+            ]
+
+        for name, page in corpus:
+            self.stdout.write(f"{name} ({len(page) / 1024 / 1024:.1f} MB)")
+            for label, extract in (("previous", legacy_extract_paths), ("current", extract_filtered_paths)):
+                tracemalloc.start()
+                started = time.perf_counter()
+                paths = extract(page, options["url"], EXTENSIONS)
+                seconds = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.stdout.write(
+                    f"  {label:<8} {seconds:6.2f} s {peak / 1024 / 1024:7.1f} MB peak {len(paths):7} paths"
+                )
@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-18 17:34
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resource', '0002_resourcerequest_delay'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resourcerequest',
+            name='max_connections',
+            field=models.PositiveSmallIntegerField(default=2, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(8)], verbose_name='max connections'),
+        ),
+    ]
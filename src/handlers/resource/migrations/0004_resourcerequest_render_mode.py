@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 17:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resource', '0003_resourcerequest_max_connections'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resourcerequest',
+            name='render_mode',
+            field=models.CharField(choices=[('static', 'Static'), ('browser', 'Browser'), ('auto', 'Auto')], default='browser', max_length=10, verbose_name='render mode'),
+        ),
+    ]
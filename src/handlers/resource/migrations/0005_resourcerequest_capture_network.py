@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resource', '0004_resourcerequest_render_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resourcerequest',
+            name='capture_network',
+            field=models.BooleanField(default=False, verbose_name='capture network'),
+        ),
+    ]
@@ -6,6 +6,7 @@ This file contains the BaseRequest implementation for the resource handler.
 from typing import Type
 
 from django.db import models
+from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.postgres.fields import ArrayField
 from django.utils.translation import gettext_lazy as _
 
@@ -18,9 +19,27 @@ class ResourceRequest(BaseRequest):
     """
     A resource handler request model which implements the BaseRequest object.
     """
+
+    RENDER_MODE_STATIC = "static"
+    RENDER_MODE_BROWSER = "browser"
+    RENDER_MODE_AUTO = "auto"
+
+    RENDER_MODES = (
+        (RENDER_MODE_STATIC, "Static"),
+        (RENDER_MODE_BROWSER, "Browser"),
+        (RENDER_MODE_AUTO, "Auto"),
+    )
+
     extensions = ArrayField(models.CharField(max_length=20), verbose_name="extensions")
     min_bytes = models.IntegerField(_("min bytes"), default=0)
     delay = models.IntegerField(_("delay"), default=0)
+    max_connections = models.PositiveSmallIntegerField(
+        _("max connections"), default=2, validators=[MinValueValidator(1), MaxValueValidator(8)]
+    )
+    render_mode = models.CharField(
+        _("render mode"), max_length=10, choices=RENDER_MODES, default=RENDER_MODE_BROWSER
+    )
+    capture_network = models.BooleanField(_("capture network"), default=False)
 
     class Meta:
         """
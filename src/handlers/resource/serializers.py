@@ -8,7 +8,7 @@ from .models import ResourceRequest
 from src.download.serializers import BaseRequestSerializer
 
 
-CUSTOM_FIELDS = ("extensions", "min_bytes", "delay")
+CUSTOM_FIELDS = ("extensions", "min_bytes", "delay", "max_connections", "render_mode", "capture_network")
 
 class ResourceRequestSerializer(BaseRequestSerializer):
     """
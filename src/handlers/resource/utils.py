@@ -0,0 +1,169 @@
+"""
+Resource handler utils.
+
+This file contains commonly used utils for the resource handler.
+"""
+import re
+import html
+import json
+import time
+import threading
+
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+
+class HostLimiter(object):
+    """
+    A per-host politeness limiter which limits the amount of concurrent connections
+    to a single host and spaces out the start of consecutive requests to that host.
+    """
+
+    max_connections = None
+    delay = None
+
+    def __init__(self, max_connections: int, delay: float) -> None:
+        """
+        Initialize the limiter.
+
+        :param max_connections: an int of the maximum concurrent connections per host.
+        :param delay: a float of the minimum seconds in between requests to the same host.
+        """
+        self.max_connections = max(1, max_connections)
+        self.delay = delay
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+        super().__init__()
+
+    @contextmanager
+    def acquire(self, url: str):
+        """
+        Acquire a connection slot for the host of the given url, waiting for a free slot and the delay.
+
+        :param url: a str containing a valid url.
+        :return: a context manager holding the connection slot.
+        """
+        host = urlsplit(url).netloc.lower()
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = (threading.Semaphore(self.max_connections), threading.Lock(), [0.0])
+            semaphore, lock, next_at = self.hosts[host]
+
+        with semaphore:
+            with lock:
+                wait = next_at[0] - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                next_at[0] = time.monotonic() + self.delay
+
+            yield
+
+
+# Installs a mutation observer (once per document) and returns the page settle state,
+# containing the ready state and the (performance) time of the last DOM mutation and finished network request.
+SETTLE_STATE_SCRIPT = """
+if (!window.__webDlSettle) {
+    window.__webDlSettle = {lastMutation: performance.now()};
+    performance.setResourceTimingBufferSize(10000);
+    new MutationObserver(function () {
+        window.__webDlSettle.lastMutation = performance.now();
+    }).observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+
+return {
+    readyState: document.readyState,
+    now: performance.now(),
+    lastMutation: window.__webDlSettle.lastMutation,
+    lastResponse: performance.getEntriesByType("resource").reduce(function (last, entry) {
+        return Math.max(last, entry.responseEnd);
+    }, 0),
+};
+"""
+
+# Scrolls down a single viewport and returns whether the bottom of the page has been reached.
+SCROLL_STEP_SCRIPT = """
+window.scrollBy(0, window.innerHeight);
+return window.innerHeight + window.scrollY >= document.documentElement.scrollHeight - 1;
+"""
+
+
+TITLE_REGEX = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+SCRIPT_REGEX = re.compile(r"<script\b[^>]*>.*?</script>", re.IGNORECASE | re.DOTALL)
+STYLE_REGEX = re.compile(r"<(style|noscript)\b[^>]*>.*?</\1>", re.IGNORECASE | re.DOTALL)
+TAG_REGEX = re.compile(r"<[^>]+>")
+SCRIPT_TAG_REGEX = re.compile(r"<script\b", re.IGNORECASE)
+# Markers of client side rendered applications, which mount their content in an (initially empty) root element.
+APP_ROOT_REGEX = re.compile(
+    r"<(div|main|body)[^>]+(id=[\"'](root|app|__next|__nuxt|svelte)[\"']|ng-app|ng-version|data-reactroot)[^>]*>\s*</\1>",
+    re.IGNORECASE,
+)
+
+
+def extract_title(page: str) -> str:
+    """
+    Extract the title of a static html page.
+
+    :param page: a str containing the html.
+    :return: a str containing the title or an empty str.
+    """
+    m = TITLE_REGEX.search(page)
+    return html.unescape(m.group(1)).strip() if m else ""
+
+
+def requires_browser(page: str, paths: list, min_text: int) -> bool:
+    """
+    Determine whether a static html page likely requires javascript to render its content,
+    as it mounts a client side rendered application, lacks visible text while loading
+    scripts or contains no paths at all.
+
+    :param page: a str containing the html.
+    :param paths: a list containing the paths extracted from the html.
+    :param min_text: an int containing the minimum amount of visible characters.
+    :return: a bool indicating whether the page should be rendered in a browser.
+    """
+    if not paths or APP_ROOT_REGEX.search(page):
+        return True
+
+    text = TAG_REGEX.sub(" ", STYLE_REGEX.sub(" ", SCRIPT_REGEX.sub(" ", page)))
+    text_length = len("".join(html.unescape(text).split()))
+
+    return text_length < min_text and SCRIPT_TAG_REGEX.search(page) is not None
+
+
+def parse_network_log(entries: list) -> dict:
+    """
+    Parse the network events of a Chrome performance log into the requested resources.
+    The size is taken from the content length header, or else from the amount of received (decoded) data.
+
+    :param entries: a list containing the performance log entries.
+    :return: a dict containing the url, status, mime type and size of every requested resource.
+    """
+    resources = {}
+    request_urls = {}
+    received = {}
+
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+
+        if method == "Network.responseReceived":
+            response = params["response"]
+            if not response["url"].startswith(("http://", "https://")):
+                continue
+            headers = {k.lower(): v for k, v in response.get("headers", {}).items()}
+            size = headers.get("content-length")
+            request_urls[params["requestId"]] = response["url"]
+            resources[response["url"]] = {
+                "status": response.get("status"),
+                "mime": response.get("mimeType", ""),
+                "size": int(size) if size and size.isdigit() else None,
+            }
+        elif method == "Network.dataReceived":
+            received[params["requestId"]] = received.get(params["requestId"], 0) + params.get("dataLength", 0)
+
+    for request_id, url in request_urls.items():
+        if resources[url]["size"] is None and request_id in received:
+            resources[url]["size"] = received[request_id]
+
+    return resources
@@ -0,0 +1,45 @@
+"""
+Handlers sessions.
+
+This file contains the pooled HTTP session shared by all handlers within a worker process.
+"""
+import os
+import threading
+import requests
+
+from http.cookiejar import DefaultCookiePolicy
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Get the pooled HTTP session of the current process. The session keeps connections alive
+    and reuses them per host. Cookies are never stored in the session, as it's shared by the requests and probes
+    of all users (cookies set during redirects are still sent within the same request). A new session is created after the process has been forked,
+    as connections can't be shared between processes.
+
+    :return: a requests Session object.
+    """
+    global _session, _session_pid
+
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                adapter = HTTPAdapter(
+                    pool_connections=settings.HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+                _session = session
+                _session_pid = os.getpid()
+
+    return _session
@@ -3,19 +3,94 @@ Handlers tasks.
 
 This file contains commonly used tasks.
 """
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Callable
+
+from django.conf import settings
+
 from src.download.serializers import PolymorphicRequestSerializer
 from src.download.models import BaseRequest
+from src.download.handlers import BaseHandlerStatus
+from .cache import get_cached_status, set_cached_status, set_cached_probe_data
+from .classifier import classify
+
+# A shared executor, so probes which didn't finish before the deadline can complete in the background.
+executor = ThreadPoolExecutor(max_workers=settings.HANDLER_PROBE_WORKERS, thread_name_prefix="handler-probe")
 
 
-def get_handlers(url: str) -> list:
+def get_handler_status(request: type, future: Future) -> dict:
+    """
+    Retrieve the handler status from a finished probe. A failed probe is considered unsupported.
+
+    :param request: the BaseRequest type of the probed handler.
+    :param future: a finished Future of the handles() call.
+    :return: a dict containing the handler status.
+    """
+    if future.exception() is not None:
+        return BaseHandlerStatus(request.__name__, False, {}).get_status()
+    return future.result().get_status()
+
+
+def cache_probe(request: type, user_id, url: str, future: Future) -> None:
+    """
+    Cache the handler status and the probe data of the user (when supported) of a finished probe.
+    Failed probes (e.g. network errors or timeouts) aren't cached, so a transient error doesn't hide a handler.
+
+    :param request: the BaseRequest type of the probed handler.
+    :param user_id: the id of the user who probed the url.
+    :param url: a str containing a valid url.
+    :param future: a finished Future of the handles() call.
+    :return: None
+    """
+    if future.exception() is not None or future.result().failed:
+        return
+
+    status = get_handler_status(request, future)
+    set_cached_status(request.get_handler_object(), url, status)
+
+    if status["supported"] and future.result().data is not None:
+        set_cached_probe_data(request.__name__, user_id, url, future.result().data)
+
+
+def get_handlers(url: str, user_id, late_cb: Callable[[dict], None] = None) -> list:
     """
     Traverse all registered handlers and retrieve handler statuses for all handlers for a given url.
+    Handlers which can't support the url according to the offline classifier aren't probed.
+    Cached statuses are used when available, all other handlers are probed concurrently and their statuses cached.
+    Handlers which haven't finished before the probe deadline are marked unknown and, when a late callback
+    is given, their status is posted to it once finished.
 
     :param url: a str containing a valid url.
+    :param user_id: the id of the user who probes the url.
+    :param late_cb: an optional callback receiving the statuses of probes that finished after the deadline.
     :return: a list containing all handler status results.
     """
-    handlers = []
+    excluded = classify(url)
+    statuses = {}
+    probes = {}
     for handler in PolymorphicRequestSerializer.model_serializer_mapping:
-        if handler is not BaseRequest:
-            handlers.append(handler.get_handler_object().handles(url).get_status())
+        if handler is BaseRequest:
+            continue
+        elif handler.__name__ in excluded:
+            statuses[handler] = BaseHandlerStatus(handler.__name__, False, {}).get_status()
+        else:
+            statuses[handler] = get_cached_status(handler.__name__, url)
+            if statuses[handler] is None:
+                probes[handler] = executor.submit(handler.get_handler_object().handles, url)
+                probes[handler].add_done_callback(lambda f, h=handler: cache_probe(h, user_id, url, f))
+
+    done, _ = wait(probes.values(), timeout=settings.HANDLER_PROBE_DEADLINE)
+
+    handlers = []
+    for handler, status in statuses.items():
+        future = probes.get(handler)
+        if future is None:
+            handlers.append(status)
+        elif future in done:
+            handlers.append(get_handler_status(handler, future))
+        else:
+            handlers.append(BaseHandlerStatus(handler.__name__, False, {}, True).get_status())
+            if late_cb:
+                future.add_done_callback(lambda f, h=handler: late_cb(get_handler_status(h, f)))
+
     return handlers
@@ -0,0 +1,187 @@
+"""
+Torrent handler client.
+
+This file contains the authenticated qBittorrent client shared by the torrent handler and supervisor within a process.
+"""
+import os
+import time
+import logging
+import threading
+import requests
+
+from django.conf import settings
+from django.core.cache import cache
+from qbittorrent import Client
+from qbittorrent.client import LoginRequired
+
+logger = logging.getLogger(__name__)
+
+# Torrents added to fetch the file list while probing are kept apart from the downloads of requests.
+PROBE_CATEGORY = "web-dl-probe"
+PROBE_SAVE_PATH = "/files/.probe"
+FILES_CACHE_PREFIX = "handlers.torrent.files"
+
+_client = None
+_client_pid = None
+_checked_at = 0
+_client_lock = threading.Lock()
+
+
+def connect() -> Client:
+    """
+    Create and authenticate a qBittorrent client, retrying with an exponential backoff.
+
+    :return: an authenticated qBittorrent Client object.
+    """
+    delay = settings.QBITTORRENT_BACKOFF
+    attempt = 1
+
+    while True:
+        try:
+            qb = Client(settings.QBITTORRENT_URL, timeout=settings.QBITTORRENT_TIMEOUT)
+            error = qb.login(settings.QBITTORRENT_USERNAME, settings.QBITTORRENT_PASSWORD)
+            if error is not None:
+                raise LoginRequired()
+            logger.debug("Connected with qBittorrent.")
+
+            return qb
+        except (requests.exceptions.RequestException, LoginRequired) as e:
+            if attempt >= settings.QBITTORRENT_RETRIES:
+                raise Exception(f"Unable to connect with qBittorrent ({str(e)}).")
+
+            logger.warning(f"Failed to connect with qBittorrent ({str(e)}). Retrying in {delay} seconds...")
+            time.sleep(delay)
+            delay = min(delay * 2, settings.QBITTORRENT_BACKOFF_MAX)
+            attempt += 1
+
+
+def healthy(qb: Client) -> bool:
+    """
+    Check whether the client is still authenticated and qBittorrent is reachable.
+
+    :param qb: a qBittorrent Client object.
+    :return: a bool indicating whether the client is healthy.
+    """
+    try:
+        qb.api_version
+        return True
+    except (requests.exceptions.RequestException, LoginRequired):
+        return False
+
+
+def get_client() -> Client:
+    """
+    Get the qBittorrent client of the current process. The client is connected lazily and reuses
+    its authenticated session, which is health checked at most once per health interval
+    and replaced by a new connection when unhealthy. A new client is created after the process
+    has been forked, as sessions can't be shared between processes.
+
+    :return: an authenticated qBittorrent Client object.
+    """
+    global _client, _client_pid, _checked_at
+
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = connect()
+            _client_pid = os.getpid()
+            _checked_at = time.monotonic()
+        elif time.monotonic() - _checked_at >= settings.QBITTORRENT_HEALTH_INTERVAL:
+            if not healthy(_client):
+                logger.warning("Connection with qBittorrent was lost. Reconnecting...")
+                _client = connect()
+            _checked_at = time.monotonic()
+
+        return _client
+
+
+def reset_client() -> None:
+    """
+    Drop the client of the current process, so the next client is reconnected (e.g. after a connection error).
+
+    :return: None
+    """
+    global _client
+
+    with _client_lock:
+        _client = None
+
+
+def fetch_files(url: str, info_hash: str, timeout: float) -> list:
+    """
+    Fetch the file list of a torrent, which is cached per info hash as it never changes.
+    Unknown torrents are temporarily added to qBittorrent in the probe category and save path
+    until their metadata has been received or the timeout passed. Only those probe torrents are removed again,
+    torrents which already existed or have been added for a request meanwhile are left alone.
+
+    :param url: a str containing a magnet link.
+    :param info_hash: a str containing the info hash of the torrent.
+    :param timeout: a float containing the maximum seconds to wait for the metadata.
+    :return: a list containing the index, name and size of every file.
+    :raises Exception: when the metadata hasn't been received within the timeout.
+    """
+    from .models import TorrentRequest
+
+    files = cache.get(f"{FILES_CACHE_PREFIX}.{info_hash}")
+    if files is not None:
+        return files
+
+    qb = get_client()
+    added = False
+    files = []
+
+    try:
+        if not qb.torrents(hashes=info_hash):
+            qb.download_from_link(url, savepath=PROBE_SAVE_PATH, category=PROBE_CATEGORY)
+            added = True
+
+        started = time.monotonic()
+        while time.monotonic() - started < timeout:
+            files = qb.get_torrent_files(info_hash)
+            if files:
+                break
+            time.sleep(0.5)
+    finally:
+        if added and not TorrentRequest.objects.filter(hash=info_hash).exists():
+            delete_probe_torrent(info_hash)
+
+    if not files:
+        raise Exception(f"Unable to retrieve the file list of {info_hash} within {timeout} seconds.")
+
+    files = [{"index": i, "name": file["name"], "size": file["size"]} for i, file in enumerate(files)]
+    cache.set(f"{FILES_CACHE_PREFIX}.{info_hash}", files, settings.TORRENT_FILES_TTL)
+
+    return files
+
+
+def delete_probe_torrent(info_hash: str) -> bool:
+    """
+    Permanently delete a torrent, but only when it has been added by a probe.
+
+    :param info_hash: a str containing the info hash of the torrent.
+    :return: a bool indicating whether a probe torrent has been deleted.
+    """
+    qb = get_client()
+    torrents = qb.torrents(hashes=info_hash, category=PROBE_CATEGORY)
+    if not torrents:
+        return False
+
+    qb.delete_permanently(info_hash)
+    return True
+
+
+def set_file_priorities(info_hash: str, indices: list, priority: int) -> None:
+    """
+    Set the priority of multiple files of a torrent in a single request.
+    A priority of 0 prevents the files from being downloaded.
+
+    :param info_hash: a str containing the info hash of the torrent.
+    :param indices: a list containing the file indices.
+    :param priority: an int containing the priority.
+    :return: None
+    """
+    # The client only supports setting the priority of a single file per request.
+    get_client()._post("torrents/filePrio", data={
+        "hash": info_hash.lower(),
+        "id": "|".join(str(i) for i in indices),
+        "priority": priority,
+    })
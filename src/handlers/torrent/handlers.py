@@ -3,14 +3,13 @@ Torrent handlers.
 
 This file contains the BaseHandler implementation of the torrent handler.
 """
-import time
 import re
-import errno
 
-from socket import error as SocketError
-from qbittorrent import Client
+from django.conf import settings
 
 from src.download.handlers import BaseHandler, BaseHandlerStatus
+from .client import get_client, fetch_files, delete_probe_torrent
+from .utils import extract_hash
 
 
 class TorrentHandler(BaseHandler):
@@ -18,8 +17,10 @@ class TorrentHandler(BaseHandler):
     A torrent handler which implements the BaseHandler object.
     """
 
-    qb = None
     hash = None
+    status_ttl = 600
+    unsupported_status_ttl = 0
+    deferred = True
 
     @staticmethod
     def handles(url: str) -> BaseHandlerStatus:
@@ -37,74 +38,43 @@ class TorrentHandler(BaseHandler):
         status.set_options({})
         status.set_supported(bool(magnet_regex.search(url)))
 
+        info_hash = extract_hash(url)
+        if status.supported and info_hash is not None:
+            try:
+                status.set_options({"files": fetch_files(url, info_hash, settings.HANDLER_PROBE_TIMEOUT)})
+            except Exception:
+                # The file list is optional, so the torrent remains supported without it (also when the metadata
+                # didn't arrive in time), but the status isn't cached so the file list is retrieved on the next probe.
+                status.set_failed(True)
+
         return status
 
     def pre_process(self) -> None:
         """
-        Additional pre-processing steps which
-        creates an connection with the qbittorrent API.
+        Additional pre-processing steps which extracts the torrent hash.
 
         :return: None
         """
-        self.connect()
+        self.hash = extract_hash(self.request.url)
+        if self.hash is None:
+            raise Exception("Unable to extract the torrent hash from the magnet link.")
+        self.request.hash = self.hash
+        self.request.save(update_fields=["hash"])
 
     def download(self) -> None:
         """
-        Additional download steps which
-        download the torrent request using qbittorrent.
+        Additional download steps which adds the torrent request to qbittorrent.
+        The download is tracked and finished by the torrent supervisor, so no worker is occupied meanwhile.
 
         :return: None
         """
-        self.qb.download_from_link(self.request.url, savepath=f"/{self.request.path}")
-        self.logger.debug(f"Added {self.request.url} to the download list.")
-
-        self.logger.debug(f"Waiting for qBittorrent pre-processing to complete.")
-        while len(self.qb.torrents()) == 0:
-            time.sleep(5)
-        self.logger.debug(f"qBitTorrent pre-processing has completed.")
-
-        torrent = self.qb.torrents()[0]
-        self.hash = torrent["hash"]
-        self.logger.debug(f"Torrent hash {self.hash} retrieved. Starting download.")
-
-        active = True
-        while active:
-            try:
-                torrent = self.qb.torrents()[0]
-
-                progress = int(torrent["progress"] * 100)
-                if progress > self.request.progress:
-                    self.request.set_progress(progress)
-
-                if torrent["state"] in ("error", "missingFiles"):
-                    self.qb.delete(self.hash)
-                    raise Exception("An error occurred in qBittorrent.")
-                elif torrent["state"] in (
-                    "uploading",
-                    "stalledUP",
-                    "checkingUP",
-                    "pausedUP",
-                    "queuedUP",
-                    "forcedUP",
-                ):
-                    self.logger.debug(f'Torrent reached uploading state: {torrent["state"]}')
-                    active = False
-                else:
-                    time.sleep(5)
-            except SocketError as e:
-                """
-                Required due to a qBittorrent API bug
-                intermittently resetting the connection.
-                """
-                if e.errno != errno.ECONNRESET:
-                    self.logger.error("Connection with qBittorrent was closed. Reconnecting...")
-                    self.connect()
-                else:
-                    raise e
-
-        self.logger.info("Torrent has completed download.")
-        self.request.set_data(torrent)
-        self.request.set_title(torrent["name"])
+        # A torrent which is still being probed would make qBittorrent ignore the new torrent.
+        if delete_probe_torrent(self.hash):
+            self.logger.debug("Removed the torrent which was added while probing the url.")
+        get_client().download_from_link(self.request.url, savepath=f"/{self.request.path}")
+        self.logger.debug(f"Added {self.request.url} with hash {self.hash} to the download list.")
+        if self.request.files:
+            self.logger.debug(f"Selected files {self.request.files} will be prioritized once the metadata is received.")
 
     def post_process(self) -> None:
         """
@@ -113,17 +83,5 @@ class TorrentHandler(BaseHandler):
 
         :return: None
         """
-        self.qb.delete(self.hash)
+        get_client().delete(self.request.hash)
         self.logger.debug(f"Torrent has been removed from qBitTorrent.")
-
-    def connect(self) -> None:
-        """
-        Create a connection with the qBittorrent API.
-
-        :return: None
-        """
-        time.sleep(5)
-
-        self.qb = Client("http://qbittorrent:8001/")
-        self.qb.login("admin", "adminadmin")
-        self.logger.debug("Connected with qBitTorrent.")
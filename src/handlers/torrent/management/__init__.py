@@ -0,0 +1,3 @@
+"""
+Torrent handler management init.
+"""
@@ -0,0 +1,3 @@
+"""
+Torrent handler commands init.
+"""
@@ -0,0 +1,28 @@
+"""
+torrent command.
+
+This file contains the torrent supervisor command.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from src.handlers.torrent.supervisor import TorrentSupervisor
+
+
+class Command(BaseCommand):
+    help = 'Supervise the active torrents in qBittorrent'
+
+    def handle(self, *args, **options):
+        """
+        Start the torrent supervisor command.
+
+        :param args: *
+        :param options: *
+        :return: None
+        """
+        self.stdout.write("Starting torrent supervisor...")
+
+        TorrentSupervisor(
+            settings.TORRENT_SUPERVISOR_INTERVAL,
+            settings.TORRENT_MISSING_TIMEOUT,
+        ).run()
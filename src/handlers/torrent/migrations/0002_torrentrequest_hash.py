@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 17:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('torrent', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='torrentrequest',
+            name='hash',
+            field=models.CharField(blank=True, db_index=True, max_length=40, verbose_name='hash'),
+        ),
+    ]
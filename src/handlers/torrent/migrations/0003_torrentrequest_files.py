@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-18 17:51
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('torrent', '0002_torrentrequest_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='torrentrequest',
+            name='files',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.PositiveIntegerField(), blank=True, default=list, size=None, verbose_name='files'),
+        ),
+    ]
@@ -5,6 +5,10 @@ This file contains the BaseRequest implementation for the torrent handler.
 """
 from typing import Type
 
+from django.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.utils.translation import gettext_lazy as _
+
 from .handlers import TorrentHandler
 from src.download.models import BaseRequest
 from src.download.handlers import BaseHandler
@@ -14,6 +18,9 @@ class TorrentRequest(BaseRequest):
     """
     A torrent handler request model which implements the BaseRequest object.
     """
+    hash = models.CharField(_("hash"), max_length=40, blank=True, db_index=True)
+    # Indices of the selected files to download, all files are downloaded when empty.
+    files = ArrayField(models.PositiveIntegerField(), verbose_name=_("files"), default=list, blank=True)
 
     class Meta:
         """
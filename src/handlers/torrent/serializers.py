@@ -7,11 +7,13 @@ from .models import TorrentRequest
 
 from src.download.serializers import BaseRequestSerializer
 
+CUSTOM_FIELDS = ("files",)
 
 class TorrentRequestSerializer(BaseRequestSerializer):
     """
     Torrent request serializer.
     """
+    excluded_fields = BaseRequestSerializer.excluded_fields + CUSTOM_FIELDS
 
     class Meta:
         """
@@ -19,6 +21,6 @@ class TorrentRequestSerializer(BaseRequestSerializer):
         """
 
         model = TorrentRequest
-        fields = BaseRequestSerializer.Meta.fields
-        read_only_fields = BaseRequestSerializer.Meta.read_only_fields
+        fields = BaseRequestSerializer.Meta.fields + CUSTOM_FIELDS + ("hash",)
+        read_only_fields = BaseRequestSerializer.Meta.read_only_fields + ("hash",)
         extra_kwargs = {"user": {"write_only": True}}
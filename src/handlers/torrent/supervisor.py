@@ -0,0 +1,186 @@
+"""
+Torrent supervisor.
+
+This file contains the long-running supervisor which tracks all active torrents in qBittorrent
+and pushes their progress and completion to the matching torrent requests.
+"""
+import time
+import logging
+
+from django.db import close_old_connections
+
+from src.download.models import BaseRequest
+from .client import get_client, reset_client, set_file_priorities
+from .models import TorrentRequest
+from .utils import COMPLETED_STATES, ERROR_STATES, UNKNOWN_ETA
+
+logger = logging.getLogger(__name__)
+
+
+class TorrentSupervisor(object):
+    """
+    A supervisor which incrementally synchronizes the state of all torrents through the qBittorrent
+    sync/maindata API, in order to update, finish or fail the downloading torrent requests by their hash.
+    """
+
+    interval = None
+    missing_timeout = None
+
+    def __init__(self, interval: float, missing_timeout: float) -> None:
+        """
+        Initialize the supervisor.
+
+        :param interval: a float of the seconds in between synchronizations.
+        :param missing_timeout: a float of the seconds before failing a request of a torrent unknown to qBittorrent.
+        """
+        self.interval = interval
+        self.missing_timeout = missing_timeout
+        self.rid = 0
+        self.torrents = {}
+        self.handlers = {}
+        self.missing = {}
+        self.errors = {}
+        self.selected = set()
+
+        super().__init__()
+
+    def run(self) -> None:
+        """
+        Supervise the torrents until interrupted, reconnecting with a full synchronization on errors.
+
+        :return: None
+        """
+        logger.info("Started torrent supervisor.")
+
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Torrent supervisor failed to poll qBittorrent ({str(e)}). Reconnecting...")
+                reset_client()
+                self.rid = 0
+            time.sleep(self.interval)
+
+    def sync(self) -> None:
+        """
+        Merge the changes since the previous synchronization into the tracked torrents.
+
+        :return: None
+        """
+        data = get_client().sync_main_data(self.rid)
+        self.rid = data["rid"]
+
+        if data.get("full_update"):
+            self.torrents = {}
+        for torrent_hash, changes in data.get("torrents", {}).items():
+            self.torrents.setdefault(torrent_hash, {"hash": torrent_hash}).update(changes)
+        for torrent_hash in data.get("torrents_removed", []):
+            self.torrents.pop(torrent_hash, None)
+
+    def poll(self) -> None:
+        """
+        Synchronize the torrents and process every downloading torrent request,
+        logging the errors of a request to the request without affecting the other requests.
+
+        :return: None
+        """
+        close_old_connections()
+        self.sync()
+
+        requests = TorrentRequest.objects.filter(status=BaseRequest.STATUS_DOWNLOADING).exclude(hash="")
+        active = set()
+
+        for request in requests:
+            active.add(request.id)
+            torrent = self.torrents.get(request.hash)
+            try:
+                if torrent is None:
+                    self.process_missing(request)
+                else:
+                    self.missing.pop(request.id, None)
+                    self.process(request, torrent)
+                self.errors.pop(request.id, None)
+            except Exception as e:
+                # A single failing request must not keep the other requests from being supervised.
+                # Repeated errors are only logged once, as the request is processed again every interval.
+                handler = self.handlers.pop(request.id, None) or request.get_handler()
+                if self.errors.get(request.id) != str(e):
+                    self.errors[request.id] = str(e)
+                    handler.logger.error(f"Torrent supervisor failed to process the request ({str(e)}).")
+                    handler.logger.flush()
+
+        # Forget requests which have been finished, failed or deleted elsewhere.
+        for request_id in (set(self.handlers) | set(self.errors) | self.selected) - active:
+            self.handlers.pop(request_id, None)
+            self.missing.pop(request_id, None)
+            self.errors.pop(request_id, None)
+            self.selected.discard(request_id)
+
+    def process(self, request: TorrentRequest, torrent: dict) -> None:
+        """
+        Push the progress of a torrent to its request and finish or fail the request when the torrent completed or failed.
+
+        :param request: a downloading TorrentRequest object.
+        :param torrent: a dict containing the synchronized torrent data.
+        :return: None
+        """
+        handler = self.handlers.get(request.id)
+        if handler is None:
+            handler = self.handlers[request.id] = request.get_handler()
+
+        if request.files and request.id not in self.selected and self.select_files(request):
+            self.selected.add(request.id)
+            handler.logger.info(f"Prioritized the selected files {request.files}, other files won't be downloaded.")
+
+        handler.reporter.update(
+            progress=int(torrent.get("progress", 0) * 100),
+            speed=torrent.get("dlspeed"),
+            eta=torrent["eta"] if torrent.get("eta", UNKNOWN_ETA) < UNKNOWN_ETA else None,
+        )
+
+        state = torrent.get("state")
+        if state in ERROR_STATES:
+            self.handlers.pop(request.id)
+            get_client().delete(request.hash)
+            handler.fail(Exception(f"An error occurred in qBittorrent ({state})."))
+        elif state in COMPLETED_STATES:
+            self.handlers.pop(request.id)
+            handler.logger.debug(f"Torrent reached uploading state: {state}")
+            handler.logger.info("Torrent has completed download.")
+            handler.reporter.flush()
+            handler.request.set_data(torrent)
+            handler.request.set_title(torrent.get("name", "")[:200])
+            handler.finish()
+
+    def select_files(self, request: TorrentRequest) -> bool:
+        """
+        Prevent the files which aren't selected from being downloaded, once the torrent metadata has been received.
+
+        :param request: a downloading TorrentRequest object with selected files.
+        :return: a bool indicating whether the file priorities have been set.
+        """
+        files = get_client().get_torrent_files(request.hash)
+        if not files:
+            return False
+
+        unselected = [i for i in range(len(files)) if i not in request.files]
+        if unselected:
+            set_file_priorities(request.hash, unselected, 0)
+
+        return True
+
+    def process_missing(self, request: TorrentRequest) -> None:
+        """
+        Fail a request when its torrent hasn't been known by qBittorrent for longer than the missing timeout,
+        e.g. as it was removed manually or lost by a qBittorrent restart.
+
+        :param request: a downloading TorrentRequest object.
+        :return: None
+        """
+        since = self.missing.setdefault(request.id, time.monotonic())
+        if time.monotonic() - since < self.missing_timeout:
+            return
+
+        self.missing.pop(request.id)
+        handler = self.handlers.pop(request.id, None) or request.get_handler()
+        handler.fail(Exception("The torrent is no longer known by qBittorrent."))
@@ -0,0 +1,38 @@
+"""
+Torrent handler utils.
+
+This file contains commonly used utils for the torrent handler.
+"""
+import re
+import base64
+
+HASH_REGEX = re.compile(r"xt=urn:btih:([a-zA-Z0-9]+)")
+
+# qBittorrent states of torrents which have completed downloading or failed.
+COMPLETED_STATES = ("uploading", "stalledUP", "checkingUP", "pausedUP", "queuedUP", "forcedUP")
+ERROR_STATES = ("error", "missingFiles")
+
+# qBittorrent reports an ETA of 8640000 (100 days) when it's unknown.
+UNKNOWN_ETA = 8640000
+
+
+def extract_hash(url: str) -> str:
+    """
+    Extract the info hash of a magnet link as used by qBittorrent,
+    converting base32 encoded hashes to their (lowercase) hexadecimal form.
+
+    :param url: a str containing a magnet link.
+    :return: a str containing the info hash or None when it's not a valid magnet link.
+    """
+    m = HASH_REGEX.search(url)
+    if m is None:
+        return None
+
+    info_hash = m.group(1)
+    if len(info_hash) == 32:
+        try:
+            return base64.b32decode(info_hash.upper()).hex()
+        except ValueError:
+            return None
+
+    return info_hash.lower() if len(info_hash) == 40 else None
@@ -5,10 +5,21 @@ This file contains commonly used utils.
 """
 import os
 import re
+import json
+import time
 import mimetypes
+import threading
 import requests
 
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from requests.structures import CaseInsensitiveDict
+
+from .sessions import get_session
+
+MIN_CHUNK_SIZE = 64 * 1024  # 64 KB
+MAX_CHUNK_SIZE = 4 * 1024 * 1024  # 4 MB
+CHUNK_READ_TARGET = 0.25  # seconds
 
 
 def create_resource_folder(path: str) -> None:
@@ -60,40 +71,205 @@ def extract_file_extension(headers: dict) -> str:
 
 
 @abstractmethod
-def _progress_cb(self, progress: int) -> None:
+def _progress_cb(self, downloaded: int, total: int) -> None:
     pass
 
 
-def download_request(url: str, path: str, filename: str, extension: str, progress_cb: _progress_cb = None) -> dict:
+def stream_response(r: requests.Response, f, on_chunk=None) -> int:
+    """
+    Stream a response body into a file object using an adaptive chunk size.
+    The chunk size doubles while full chunks are read well within the read target time
+    and halves when reads exceed it, so fast connections need far fewer reads and writes.
+
+    :param r: a streaming requests Response object.
+    :param f: a writable file object.
+    :param on_chunk: an optional callback receiving the size of every written chunk.
+    :return: an int containing the amount of bytes written.
+    """
+    chunk_size = MIN_CHUNK_SIZE
+    written = 0
+
+    while True:
+        started = time.monotonic()
+        chunk = r.raw.read(chunk_size, decode_content=True)
+        if not chunk:
+            break
+        elapsed = time.monotonic() - started
+
+        f.write(chunk)
+        written += len(chunk)
+        if on_chunk and on_chunk(len(chunk)) is False:
+            break
+
+        if len(chunk) >= chunk_size and elapsed < CHUNK_READ_TARGET / 2 and chunk_size < MAX_CHUNK_SIZE:
+            chunk_size *= 2
+        elif elapsed > CHUNK_READ_TARGET * 2 and chunk_size > MIN_CHUNK_SIZE:
+            chunk_size //= 2
+
+    return written
+
+
+def supports_ranges(headers: dict) -> bool:
+    """
+    Check whether the request headers advertise byte range support with a known content length.
+
+    :param headers: a request headers dictionary.
+    :return: a bool whether the resource can be downloaded in byte ranges.
     """
+    headers = CaseInsensitiveDict(headers)
+    return (
+        headers.get("Accept-Ranges", "").lower() == "bytes"
+        and headers.get("Content-Length", "").isdigit()
+        and int(headers.get("Content-Length")) > 0
+    )
+
+
+def extract_validators(headers: dict) -> dict:
+    """
+    Extract the cache validators from request headers.
+
+    :param headers: a request headers dictionary.
+    :return: a dict containing the etag and last modified validators.
+    """
+    headers = CaseInsensitiveDict(headers)
+    return {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+    }
+
+
+def get_manifest_path(path: str, filename: str, extension: str) -> str:
+    """
+    Get the path of the sidecar manifest of a (partially) downloaded file.
+
+    :param path: the path the file is stored in.
+    :param filename: the filename of the resource.
+    :param extension: the extension of the resource.
+    :return: a str containing the manifest file path.
+    """
+    return f"{path}/.{filename}{extension}.manifest"
+
+
+def load_manifest(file: str) -> dict:
+    """
+    Load a sidecar manifest.
+
+    :param file: the manifest file path.
+    :return: a dict containing the manifest or None if there's no (valid) manifest.
+    """
+    try:
+        with open(file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(file: str, manifest: dict) -> None:
+    """
+    Atomically write a sidecar manifest.
+
+    :param file: the manifest file path.
+    :param manifest: a dict containing the manifest.
+    :return: None
+    """
+    with open(f"{file}.tmp", "w") as f:
+        json.dump(manifest, f)
+    os.replace(f"{file}.tmp", file)
+
+
+def split_ranges(total: int, connections: int) -> list:
+    """
+    Split a total amount of bytes into (inclusive) byte ranges of about equal size.
+
+    :param total: the total amount of bytes.
+    :param connections: the amount of ranges to split into.
+    :return: a list containing (start, end) tuples.
+    """
+    size = -(-total // max(1, min(connections, total)))
+    return [(start, min(start + size, total) - 1) for start in range(0, total, size)]
+
+
+def download_request(
+        url: str,
+        path: str,
+        filename: str,
+        extension: str,
+        progress_cb: _progress_cb = None,
+        connections: int = 1,
+        headers: dict = None,
+) -> dict:
+    """
+    Download a resource over a single stream or, when the given headers advertise byte range support,
+    over (multiple parallel) resumable byte range connections.
+
     :param url: a url to download from.
     :param path: the path to store the file in.
     :param filename: the filename of the resource.
     :param extension: the extension of the resource.
     :param progress_cb: callback to post progress towards.
+    :param connections: the maximum amount of parallel connections to use.
+    :param headers: an optional dict containing previously retrieved headers of the resource.
+    :return: a dict containing the download results.
+    """
+    if headers and supports_ranges(headers) and (connections > 1 or any(extract_validators(headers).values())):
+        return download_request_segmented(
+            url,
+            path,
+            filename,
+            extension,
+            int(CaseInsensitiveDict(headers)["Content-Length"]),
+            connections,
+            progress_cb,
+            headers,
+        )
+
+    try:
+        with get_session().get(url, stream=True) as r:
+            return download_response(r, path, filename, extension, progress_cb)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+        }
+
+
+def download_response(
+        r: requests.Response,
+        path: str,
+        filename: str,
+        extension: str,
+        progress_cb: _progress_cb = None,
+) -> dict:
+    """
+    Download the body of an already opened streaming response.
+
+    :param r: a streaming requests Response object.
+    :param path: the path to store the file in.
+    :param filename: the filename of the resource.
+    :param extension: the extension of the resource.
+    :param progress_cb: callback to post progress towards.
     :return: a dict containing the download results.
     """
     try:
-        r = requests.get(url, stream=True)
         total = r.headers.get("content-length")
-        chunk_size = 1024  # 1 MB
-        chunks = 1
+        chunks = 0
         dl = 0
 
-        with open(f"{path}/{filename}{extension}", "wb+") as f:
-            for chunk in r.iter_content(chunk_size):
-                f.write(chunk)
-                chunks += 1
+        def on_chunk(size: int) -> None:
+            nonlocal chunks, dl
+            chunks += 1
+            dl += size
+
+            if progress_cb:
+                progress_cb(dl, int(total) if total is not None else None)
 
-                if total is not None and progress_cb:
-                    progress_cb(int((dl / int(total)) * 100))
-                    dl += chunk_size
+        with open(f"{path}/{filename}{extension}", "wb+", buffering=0) as f:
+            stream_response(r, f, on_chunk)
 
         return {
             "success": True,
             "url": r.url,
             "total_size": total,
-            "chunk_size": chunk_size,
             "chunks": chunks,
             "downloaded": dl,
         }
@@ -102,3 +278,131 @@ def download_request(url: str, path: str, filename: str, extension: str, progres
             "success": False,
             "error": str(e),
         }
+
+
+def download_request_segmented(
+        url: str,
+        path: str,
+        filename: str,
+        extension: str,
+        total: int,
+        connections: int,
+        progress_cb: _progress_cb = None,
+        headers: dict = None,
+) -> dict:
+    """
+    Download a resource in parallel byte ranges into a preallocated file.
+    Progress of all segments is merged and posted from the calling thread only.
+
+    When the resource has validators (ETag or Last-Modified) a sidecar manifest containing the validators
+    and segment map is kept next to the file, allowing a later call to resume the download
+    as long as the validators still match. The manifest is removed once the download completes.
+
+    :param url: a url to download from.
+    :param path: the path to store the file in.
+    :param filename: the filename of the resource.
+    :param extension: the extension of the resource.
+    :param total: the total size of the resource in bytes.
+    :param connections: the amount of parallel connections to use.
+    :param progress_cb: callback to post progress towards.
+    :param headers: an optional dict containing previously retrieved headers of the resource.
+    :return: a dict containing the download results.
+    """
+    file = f"{path}/{filename}{extension}"
+    manifest_file = get_manifest_path(path, filename, extension)
+    validators = extract_validators(headers or {})
+    resumable = any(validators.values())
+    # Weak ETags can't be used for conditional range requests.
+    if_range = (
+        validators["etag"]
+        if validators["etag"] and not validators["etag"].startswith("W/")
+        else validators["last_modified"]
+    )
+    cancelled = threading.Event()
+
+    manifest = load_manifest(manifest_file) if resumable else None
+    resumed = bool(
+        manifest
+        and manifest.get("validators") == validators
+        and manifest.get("total_size") == total
+        and os.path.isfile(file)
+        and os.path.getsize(file) == total
+    )
+    segments = (
+        [(start, end) for start, end, _ in manifest["segments"]]
+        if resumed
+        else split_ranges(total, connections)
+    )
+    downloaded = [done for _, _, done in manifest["segments"]] if resumed else [0] * len(segments)
+
+    def checkpoint() -> None:
+        if resumable:
+            save_manifest(manifest_file, {
+                "url": url,
+                "validators": validators,
+                "total_size": total,
+                "segments": [[start, end, downloaded[i]] for i, (start, end) in enumerate(segments)],
+            })
+
+    def fetch_segment(index: int, start: int, end: int) -> None:
+        if start + downloaded[index] > end:
+            return
+
+        range_headers = {"Range": f"bytes={start + downloaded[index]}-{end}"}
+        if if_range:
+            range_headers["If-Range"] = if_range
+
+        def on_chunk(size: int) -> bool:
+            downloaded[index] += size
+            return not cancelled.is_set()
+
+        with get_session().get(url, headers=range_headers, stream=True) as r:
+            if r.status_code != requests.codes.partial_content:
+                raise Exception(f"Range request for bytes {start}-{end} returned status {r.status_code}.")
+
+            # Unbuffered, so the manifest never accounts for bytes which haven't reached the file yet.
+            with open(file, "r+b", buffering=0) as f:
+                f.seek(start + downloaded[index])
+                stream_response(r, f, on_chunk)
+
+    try:
+        if not resumed:
+            with open(file, "wb") as f:
+                f.truncate(total)
+        checkpoint()
+
+        with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+            futures = [executor.submit(fetch_segment, i, start, end) for i, (start, end) in enumerate(segments)]
+
+            pending = futures
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_EXCEPTION)
+                if any(future.exception() for future in done):
+                    cancelled.set()
+                    break
+
+                checkpoint()
+                if progress_cb:
+                    progress_cb(sum(downloaded), total)
+
+        checkpoint()
+        for future in futures:
+            if future.exception():
+                raise future.exception()
+
+        if resumable:
+            os.remove(manifest_file)
+
+        return {
+            "success": True,
+            "url": url,
+            "total_size": total,
+            "connections": len(segments),
+            "downloaded": sum(downloaded),
+            "resumed": resumed,
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+        }
@@ -5,6 +5,8 @@ import re
 
 from base64 import b64decode
 
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
 from rest_framework.views import APIView
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
@@ -24,12 +26,31 @@ class GetHandlerStatusesView(APIView):
     def get(self, *args, **kwargs) -> Response:
         """
         Traverse all handlers to retrieve handler options and support status.
+        When the push query param is set, statuses of handlers which didn't finish before
+        the probe deadline are sent to the user's websocket group once they finish.
 
         :param args: *
         :param kwargs: *
         :return: Response
         """
         url = b64decode(self.request.query_params.get("url")).decode("utf-8")
+        push = self.request.query_params.get("push") in ("1", "true", "True")
+        group = f"requests.group.{self.request.user.id}"
+
+        def late_cb(status: dict) -> None:
+            async_to_sync(get_channel_layer().group_send)(
+                group,
+                {
+                    "type": "websocket.send",
+                    "data": {
+                        "type": "handlers.status.update",
+                        "message": {
+                            "url": url,
+                            "status": status,
+                        },
+                    },
+                },
+            )
 
         url_regex = re.compile(
             r"[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b([-a-zA-Z0-9()@:%_\+.~#?&//=]*)"
@@ -39,7 +60,7 @@ class GetHandlerStatusesView(APIView):
         )
 
         return (
-            Response(status=200, data=get_handlers(url))
+            Response(status=200, data=get_handlers(url, self.request.user.id, late_cb if push else None))
             if url and (url_regex.search(url) or magnet_regex.search(url))
             else Response(status=400)
         )
@@ -0,0 +1,77 @@
+# Partitions the user_log table by day on created_at.
+# The existing rows are kept in user_log_old, from which they're moved in batches by the maintenance.
+# The partitions are created the way the maintenance creates them, but are inlined so this migration never changes.
+
+import datetime
+import zoneinfo
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_partitions(apps, schema_editor):
+    tz = zoneinfo.ZoneInfo(settings.TIME_ZONE)
+    start = datetime.datetime.now(tz).date()
+
+    with schema_editor.connection.cursor() as cursor:
+        # The partitions of the current day and the seven days ahead.
+        for _ in range(8):
+            end = start + datetime.timedelta(days=1)
+            cursor.execute(
+                f'CREATE TABLE "user_log_{start:%Y%m%d}" PARTITION OF "user_log" FOR VALUES FROM (%s) TO (%s)',
+                [datetime.datetime.combine(start, datetime.time(), tz), datetime.datetime.combine(end, datetime.time(), tz)],
+            )
+            start = end
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0004_user_technical'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql=[
+                        'ALTER TABLE "user_log" RENAME TO "user_log_old"',
+                        'ALTER TABLE "user_log_old" RENAME CONSTRAINT "user_log_pkey" TO "user_log_old_pkey"',
+                        'CREATE TABLE "user_log" (LIKE "user_log_old" INCLUDING DEFAULTS) '
+                        'PARTITION BY RANGE ("created_at")',
+                        'ALTER TABLE "user_log" ADD CONSTRAINT "user_log_pkey" PRIMARY KEY ("id", "created_at")',
+                        'ALTER TABLE "user_log" ADD CONSTRAINT "user_log_user_id_fk_user_id" '
+                        'FOREIGN KEY ("user_id") REFERENCES "user" ("id") DEFERRABLE INITIALLY DEFERRED',
+                        'CREATE INDEX "user_log_user_created_idx" ON "user_log" ("user_id", "created_at")',
+                        'CREATE TABLE "user_log_default" PARTITION OF "user_log" DEFAULT',
+                    ],
+                    reverse_sql=[
+                        'DROP TABLE "user_log"',
+                        'ALTER TABLE "user_log_old" RENAME CONSTRAINT "user_log_old_pkey" TO "user_log_pkey"',
+                        'ALTER TABLE "user_log_old" RENAME TO "user_log"',
+                    ],
+                ),
+                migrations.RunPython(create_partitions, migrations.RunPython.noop),
+                migrations.RunSQL(
+                    sql=migrations.RunSQL.noop,
+                    # The legacy table may have been dropped already, once its rows have been moved.
+                    reverse_sql=[
+                        'DO $$ BEGIN IF to_regclass(\'user_log_old\') IS NULL THEN '
+                        'CREATE TABLE "user_log_old" (LIKE "user_log" INCLUDING DEFAULTS); '
+                        'ALTER TABLE "user_log_old" ADD CONSTRAINT "user_log_old_pkey" PRIMARY KEY ("id"); '
+                        'ALTER TABLE "user_log_old" ADD CONSTRAINT "user_log_old_user_id_fk_user_id" '
+                        'FOREIGN KEY ("user_id") REFERENCES "user" ("id") DEFERRABLE INITIALLY DEFERRED; '
+                        'CREATE INDEX "user_log_old_user_id_idx" ON "user_log_old" ("user_id"); '
+                        'END IF; END $$',
+                        'INSERT INTO "user_log_old" SELECT * FROM "user_log"',
+                    ],
+                ),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='log',
+                    index=models.Index(fields=['user', 'created_at'], name='user_log_user_created_idx'),
+                ),
+            ],
+        ),
+    ]
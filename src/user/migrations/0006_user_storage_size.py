@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0005_partition_user_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='storage_size',
+            field=models.BigIntegerField(default=0, verbose_name='storage size'),
+        ),
+    ]
@@ -15,6 +15,8 @@ class User(ModifiedAtMixin, IdMixin, AbstractUser):
     A user entity which extends the Django admin user in order to implement additional custom fields.
     """
     technical = models.BooleanField(_('technical'), default=False)
+    # The total storage size (in bytes) of all requests, kept in step by BaseRequest.set_storage_size().
+    storage_size = models.BigIntegerField(_('storage size'), default=0)
 
     class Meta:
         db_table = "user"
@@ -54,3 +56,13 @@ class Log(CreatedAtMixin, IdMixin):
     )
     url = models.TextField(_("url"))
     data = models.JSONField(_("data"), default=dict, null=True)
+
+    class Meta:
+        """
+        Model metadata.
+        See https://docs.djangoproject.com/en/3.0/ref/models/options/
+        """
+
+        indexes = [
+            models.Index(fields=["user", "created_at"], name="user_log_user_created_idx"),
+        ]
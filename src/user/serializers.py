@@ -32,7 +32,8 @@ class UserSerializer(serializers.ModelSerializer):
             "last_login",
             "date_joined",
             "full_name",
-            "technical"
+            "technical",
+            "storage_size"
         )
         read_only_fields = (
             "id",
@@ -42,7 +43,8 @@ class UserSerializer(serializers.ModelSerializer):
             "is_active",
             "date_joined",
             "modified_at",
-            "full_name"
+            "full_name",
+            "storage_size"
         )
         extra_kwargs = {"password": {"write_only": True}}
 